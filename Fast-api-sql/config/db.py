@@ -1,5 +1,31 @@
 from sqlalchemy import create_engine,MetaData
+from sqlalchemy.ext.asyncio import create_async_engine
+from config.sqlite import apply_sqlite_profile
 
-engine=create_engine("sqlite:///mydb.db")
+DATABASE_URL = "sqlite:///mydb.db"
+
+# Blocking engine, for scripts and DDL
+engine=create_engine(DATABASE_URL)
+apply_sqlite_profile(engine)
+# Asyncio engine with a connection pool, used by the routes
+async_engine=create_async_engine(DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1))
+apply_sqlite_profile(async_engine.sync_engine)
 meta=MetaData()
-conn=engine.connect()
+
+
+# Dependency: a pooled connection per request, returned to the pool afterwards.
+# Write routes wrap their statements in conn.begin(), so each commits on its own.
+async def get_conn():
+    async with async_engine.connect() as conn:
+        yield conn
+
+
+# Pre-fork hooks for serve.py: the master closes its pooled connections before
+# forking, and each worker drops the inherited pools without closing them again
+def before_fork():
+    engine.dispose()
+
+
+def after_fork():
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
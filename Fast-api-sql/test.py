@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from config.db import get_conn, meta
+from config.sqlite import apply_sqlite_profile, sqlite_pragmas, SQLITE_OVERRIDES
+from main import app
+import tempfile
+
+# Throwaway database file, so mydb.db is never touched; both engines go through
+# the same connect hook as config/db.py
+directory = tempfile.TemporaryDirectory()
+DATABASE_URL = f"sqlite:///{directory.name}/test.db"
+engine = apply_sqlite_profile(create_engine(DATABASE_URL))
+# TestClient may run each request on a fresh event loop, so never reuse connections
+async_engine = create_async_engine(DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1), poolclass=NullPool)
+apply_sqlite_profile(async_engine.sync_engine)
+meta.create_all(bind=engine)
+
+async def override_get_conn():
+    async with async_engine.connect() as conn:
+        yield conn
+
+app.dependency_overrides[get_conn] = override_get_conn
+client = TestClient(app)
+
+
+def test_add_and_get_user():
+    response = client.post("/add-user", json={"name": "smoke", "email": "smoke@example.com", "password": "secret"})
+    assert response.status_code == 200, response.text
+    users = client.get("/get-users").json()
+    assert [user["name"] for user in users] == ["smoke"]
+    assert client.get(f"/get-user/{users[0]['id']}").json()["email"] == "smoke@example.com"
+    assert client.get("/get-user/999").status_code == 404
+
+
+def test_sqlite_profile():
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    assert sqlite_pragmas("default") == {}
+    with pytest.raises(ValueError):
+        sqlite_pragmas("fastest")
+
+
+def test_sqlite_profile_override(monkeypatch):
+    monkeypatch.setitem(SQLITE_OVERRIDES, "synchronous", "FULL")
+    assert sqlite_pragmas("wal")["synchronous"] == "FULL"
@@ -1,25 +1,47 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from routes.routes import taskRouter
-
-
-# Import the function to create tables
-from config.db import create_db # This should match the function name in db.py
-
-# Call create_db() to create tables on app startup
-create_db()
-
-
-app = FastAPI()
+from routes.admin import adminRouter
+from utils.hashing import hashing_pool
+from config.sql_log import start_sql_logging, stop_sql_logging
+from utils.compression import CompressionMiddleware
+from utils.deadlines import deadline_scheduler
+from utils.task_stream import task_hub
+from utils.idempotency import idempotency_store
+from migrations.schema import bootstrap_schema
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tables are checked against schema_version here, not at import
+    await bootstrap_schema()
+    # Password hashing runs on its own process pool for the app's lifetime
+    hashing_pool.start()
+    start_sql_logging()
+    deadline_scheduler.start()
+    task_hub.start()
+    idempotency_store.start()
+    yield
+    await idempotency_store.stop()
+    await task_hub.stop()
+    await deadline_scheduler.stop()
+    stop_sql_logging()
+    hashing_pool.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
 
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc):
     return JSONResponse(
         status_code=422,
-        content={"detail": "Validation error", "errors": exc.errors()}
+        content={"detail": "Validation error", "errors": jsonable_encoder(exc.errors())}
     )
 
 @app.exception_handler(HTTPException)
@@ -31,3 +53,4 @@ async def http_exception_handler(request, exc):
 
 # Include the task router
 app.include_router(taskRouter)
+app.include_router(adminRouter)
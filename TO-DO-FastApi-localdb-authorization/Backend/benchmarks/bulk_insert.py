@@ -0,0 +1,59 @@
+# Compare POST /task/-style single inserts against the chunked bulk path.
+# Usage (throwaway SQLite file by default):
+#   DB_URL=sqlite:///./bench.db python -m benchmarks.bulk_insert [rows] [batch_size]
+from datetime import datetime
+from sqlalchemy import delete
+from config.db import AsyncSessionLocal
+from migrations.schema import migrate
+from models.index import Task, User
+from schemas.schema import TaskSchema
+from utils.bulk import bulk_insert_tasks, TASK_BULK_BATCH_SIZE
+import asyncio
+import time
+import sys
+
+
+def make_tasks(prefix: str, rows: int):
+    now = datetime.now()
+    return [
+        TaskSchema(title=f"{prefix}-{i}", description="bench", status=False, created_at=now, updated_at=now, deadline=now)
+        for i in range(rows)
+    ]
+
+
+async def single_inserts(db, owner_id: int, tasks):
+    for task in tasks:
+        new_task = Task(owner_id=owner_id, **task.model_dump(exclude={"task_id"}))
+        db.add(new_task)
+        await db.commit()
+        await db.refresh(new_task)
+
+
+async def main(rows: int, batch_size: int):
+    migrate()
+    async with AsyncSessionLocal() as db:
+        owner = User(user_name=f"bench-{time.time_ns()}", user_password="x")
+        db.add(owner)
+        await db.commit()
+
+        start = time.perf_counter()
+        await single_inserts(db, owner.user_id, make_tasks(f"single-{owner.user_id}", rows))
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await bulk_insert_tasks(db, owner.user_id, make_tasks(f"bulk-{owner.user_id}", rows), batch_size)
+        bulk = time.perf_counter() - start
+
+        await db.execute(delete(Task).where(Task.owner_id == owner.user_id))
+        await db.delete(owner)
+        await db.commit()
+
+    print(f"{rows} rows, batch size {batch_size}")
+    print(f"single inserts: {single:8.3f}s  {rows / single:10.0f} rows/s")
+    print(f"bulk inserts:   {bulk:8.3f}s  {rows / bulk:10.0f} rows/s  ({single / bulk:.1f}x)")
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else TASK_BULK_BATCH_SIZE
+    asyncio.run(main(rows, batch_size))
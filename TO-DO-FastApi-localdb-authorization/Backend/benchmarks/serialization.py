@@ -0,0 +1,49 @@
+# Compare the old GET /tasks serialization path with the TypeAdapter fast path.
+# Usage: python -m benchmarks.serialization
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from models.index import Task
+from schemas.schema import TaskResponse
+from utils.serialization import dump_tasks
+import json
+import time
+
+response_adapter = TypeAdapter(list[TaskResponse])
+
+
+def make_tasks(count: int):
+    now = datetime.now()
+    return [
+        Task(task_id=i, title=f"Task {i}", description="Benchmark task", status=bool(i % 2),
+             created_at=now, updated_at=now, deadline=now, owner_id=1, version=0)
+        for i in range(count)
+    ]
+
+
+# What the route used to do: model_validate per row, then FastAPI validates the
+# list again against response_model, converts it to plain data and json.dumps it
+def old_path(tasks) -> bytes:
+    content = [TaskResponse.model_validate(task) for task in tasks]
+    value = response_adapter.validate_python(content)
+    data = jsonable_encoder(response_adapter.dump_python(value, mode="json"))
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def best_of(fn, tasks, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(tasks)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    print(f"{'tasks':>8} {'old (ms)':>10} {'fast (ms)':>10} {'speedup':>8}")
+    for count, repeat in ((10, 200), (1_000, 20), (100_000, 3)):
+        tasks = make_tasks(count)
+        assert json.loads(old_path(tasks)) == json.loads(dump_tasks(tasks))
+        old = best_of(old_path, tasks, repeat)
+        fast = best_of(dump_tasks, tasks, repeat)
+        print(f"{count:>8} {old * 1000:>10.2f} {fast * 1000:>10.2f} {old / fast:>7.1f}x")
@@ -1,24 +1,66 @@
 from sqlalchemy import create_engine,MetaData
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from dotenv import load_dotenv
 from sqlalchemy.orm import registry
+from config.pool import pool_options, instrument
+from config.sql_log import DB_ECHO, instrument_sql
 import os
 
 load_dotenv()
 DB_URL = DB_URL = os.getenv("DB_URL")
-engine = create_engine(DB_URL,echo=True)
+
+# Driver pairs per backend: (blocking driver, asyncio driver).
+# The DB_URL scheme picks the backend; either driver may be named in it.
+DRIVERS = {
+    "mysql": ("pymysql", "aiomysql"),
+    "sqlite": ("pysqlite", "aiosqlite"),
+    "postgresql": ("psycopg2", "asyncpg"),
+}
+
+
+def _with_driver(url, index):
+    url = make_url(url)
+    drivers = DRIVERS.get(url.get_backend_name())
+    if drivers is None:
+        return url
+    return url.set(drivername=f"{url.get_backend_name()}+{drivers[index]}")
+
+
+def sync_url(url):
+    return _with_driver(url, 0)
+
+
+def async_url(url):
+    return _with_driver(url, 1)
+
+
+# Blocking engine, used for DDL and scripts
+engine = create_engine(sync_url(DB_URL),echo=DB_ECHO,**pool_options(DB_URL, is_async=False))
+instrument(engine, "sync")
+instrument_sql(engine)
 SessionLocal = sessionmaker(autocommit=False,autoflush=False, bind=engine)
 
+# Asyncio engine, used by every request handler
+async_engine = create_async_engine(async_url(DB_URL),echo=DB_ECHO,**pool_options(DB_URL, is_async=True))
+instrument(async_engine.sync_engine, "async")
+instrument_sql(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 mapper_registry = registry()
 Base = mapper_registry.generate_base()
 meta=MetaData()
 
 
-# Function to create tables explicitly if they don't exist
-def create_db():
-    print("Creating tables if they do not exist...")
-    # Ensure the tables are created
-    Base.metadata.create_all(bind=engine)
-    print("Tables created successfully.")
+# Pre-fork hooks for serve.py: the master closes its pooled connections before
+# forking, and each worker drops the inherited pools without closing sockets
+# the other processes still hold
+def before_fork():
+    engine.dispose()
+
 
+def after_fork():
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
@@ -0,0 +1,143 @@
+from logging.handlers import QueueHandler, QueueListener
+from functools import lru_cache
+from sqlalchemy import event
+from dotenv import load_dotenv
+import threading
+import logging
+import random
+import queue
+import time
+import re
+import os
+
+load_dotenv()
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+SQL_SAMPLE_RATE = float(os.getenv("SQL_SAMPLE_RATE", "0.01"))
+SQL_LOG_QUEUE_SIZE = int(os.getenv("SQL_LOG_QUEUE_SIZE", "10000"))
+
+logger = logging.getLogger("sql")
+
+
+# Drops records instead of blocking the caller when the queue is full
+class DroppingQueueHandler(QueueHandler):
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_log_queue = queue.Queue(maxsize=SQL_LOG_QUEUE_SIZE)
+_queue_handler = DroppingQueueHandler(_log_queue)
+_listener = QueueListener(_log_queue, logging.StreamHandler(), respect_handler_level=True)
+logger.addHandler(_queue_handler)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+
+def start_sql_logging():
+    if _listener._thread is None:
+        _listener.start()
+
+
+def stop_sql_logging():
+    if _listener._thread is not None:
+        _listener.stop()
+
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+# Literals and placeholder lists vary per call; strip them so one shape is one key
+@lru_cache(maxsize=1024)
+def normalize(statement: str) -> str:
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _IN_LIST.sub("(...)", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+
+# Per-statement timings keyed by normalized SQL
+class QueryStats:
+    def __init__(self):
+        self.slow_queries = 0
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float, slow: bool = False):
+        with self._lock:
+            self.slow_queries += slow
+            entry = self._stats.get(statement)
+            if entry is None:
+                entry = self._stats[statement] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.slow_queries = 0
+
+    def top(self, limit: int = 20) -> list[dict]:
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {
+                "statement": statement,
+                "calls": calls,
+                "total_ms": total * 1000,
+                "avg_ms": total / calls * 1000,
+                "max_ms": longest * 1000,
+            }
+            for statement, (calls, total, longest) in items
+        ]
+
+
+query_stats = QueryStats()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    slow = elapsed * 1000 >= SQL_SLOW_QUERY_MS
+    query_stats.record(normalize(statement), elapsed, slow)
+    # Never log bound parameters: they carry password hashes, task contents and stored responses
+    if slow:
+        logger.warning("slow query %.1f ms: %s", elapsed * 1000, statement)
+    elif SQL_SAMPLE_RATE > 0 and random.random() < SQL_SAMPLE_RATE:
+        logger.info("query %.1f ms: %s", elapsed * 1000, statement)
+
+
+# A failed statement never reaches after_cursor_execute; drop its start time
+def _handle_error(context):
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def instrument_sql(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    return engine
+
+
+def sql_log_stats(limit: int = 20) -> dict:
+    return {
+        "slow_query_ms": SQL_SLOW_QUERY_MS,
+        "sample_rate": SQL_SAMPLE_RATE,
+        "slow_queries": query_stats.slow_queries,
+        "dropped_log_records": _queue_handler.dropped,
+        "statements": query_stats.top(limit),
+    }
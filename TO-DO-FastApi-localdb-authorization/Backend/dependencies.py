@@ -1,16 +1,12 @@
 from fastapi.security import OAuth2PasswordBearer
-from config.db import SessionLocal
+from config.db import AsyncSessionLocal
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
 import jwt
 
 # Dependency for getting DB session
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db  # Provides a session to the request
-    finally:
-        db.close()  # Closes the session after the request is complete
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db  # Provides a session to the request; closed when the request completes
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -0,0 +1,12 @@
+from config.db import engine
+from migrations.schema import migrate
+from utils.sync import prune_tombstones, TASK_TOMBSTONE_RETENTION_DAYS
+
+
+# Drop delta sync tombstones older than TASK_TOMBSTONE_RETENTION_DAYS; run it
+# daily from cron. Clients with an older cursor are told to resync in full.
+if __name__ == "__main__":
+    migrate()
+    with engine.begin() as connection:
+        owners = prune_tombstones(connection)
+    print(f"Pruned tombstones older than {TASK_TOMBSTONE_RETENTION_DAYS} days for {owners} users.")
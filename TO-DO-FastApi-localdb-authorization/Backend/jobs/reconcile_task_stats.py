@@ -0,0 +1,12 @@
+from config.db import engine
+from migrations.schema import migrate
+from utils.task_stats import reconcile_task_stats
+
+
+# Rebuild task_stats from tasks, e.g. after upgrading or if counters ever drift.
+# Runs in one transaction, so readers see either the old or the new counters.
+if __name__ == "__main__":
+    migrate()
+    with engine.begin() as connection:
+        reconcile_task_stats(connection)
+    print("Task stats reconciled.")
@@ -0,0 +1,145 @@
+from sqlalchemy import select, update, insert, inspect, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from contextlib import contextmanager
+from datetime import datetime
+from dotenv import load_dotenv
+from config.db import Base, engine
+from models.index import SchemaVersion
+from migrations import task_versions, task_indexes
+from utils.task_stats import reconcile_task_stats
+import asyncio
+import logging
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: SQLite bootstrap runs unlocked
+    fcntl = None
+
+load_dotenv()
+SCHEMA_LOCK_TIMEOUT = int(os.getenv("SCHEMA_LOCK_TIMEOUT", "300"))
+SCHEMA_WAIT_SECONDS = float(os.getenv("SCHEMA_WAIT_SECONDS", "30"))
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_LOCK_NAME = "todo_schema"
+SCHEMA_LOCK_KEY = 0x746F646F  # pg_advisory_lock key
+
+
+# Everything up to the schema_version table: tables, the version columns and
+# indexes older databases lack, and task_stats rebuilt for their existing tasks
+def _baseline(connection):
+    Base.metadata.create_all(bind=connection)
+    task_versions.upgrade(connection)
+    task_indexes.upgrade(connection)
+    reconcile_task_stats(connection)
+
+
+# Ordered (version, step) pairs; a schema change appends the next one
+MIGRATIONS = [
+    (1, _baseline),
+    (2, task_indexes.upgrade),  # keyset indexes for sort=deadline and sort=title
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# Applied schema version, or 0 for a database that predates schema_version
+def read_version(connection) -> int:
+    try:
+        return connection.execute(select(SchemaVersion.version).where(SchemaVersion.id == 1)).scalar() or 0
+    except DBAPIError:
+        connection.rollback()
+        if inspect(connection).has_table(SchemaVersion.__tablename__):
+            raise
+        return 0
+
+
+def _set_version(connection, version: int):
+    values = {"version": version, "applied_at": datetime.now()}
+    if connection.execute(update(SchemaVersion).where(SchemaVersion.id == 1).values(values)).rowcount == 0:
+        connection.execute(insert(SchemaVersion).values(id=1, **values))
+
+
+# Held while migrating so only one of many starting workers runs the steps:
+# a named lock on MySQL, an advisory lock on PostgreSQL, a lock file next to
+# the database file on SQLite. All are released if the process dies.
+@contextmanager
+def _schema_lock(connection):
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        name = f"{connection.engine.url.database}.{SCHEMA_LOCK_NAME}"
+        if connection.execute(text("SELECT GET_LOCK(:name, :timeout)"), {"name": name, "timeout": SCHEMA_LOCK_TIMEOUT}).scalar() != 1:
+            raise RuntimeError("Timed out waiting for the schema migration lock")
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+    elif dialect == "postgresql":
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+    else:
+        database = connection.engine.url.database
+        if fcntl is None or not database or database == ":memory:":
+            yield
+            return
+        with open(f"{database}.schema-lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+# Bring the schema up to SCHEMA_VERSION (blocking connection). A current schema
+# costs one primary-key read; otherwise the pending steps run under the lock,
+# each committed with its version, and workers that waited re-read and skip.
+def ensure_schema(connection) -> int:
+    version = read_version(connection)
+    if version >= SCHEMA_VERSION:
+        if version > SCHEMA_VERSION:
+            logger.warning("database schema version %d is newer than this code (%d)", version, SCHEMA_VERSION)
+        return version
+
+    connection.rollback()
+    with _schema_lock(connection):
+        version = read_version(connection)
+        for target, step in MIGRATIONS:
+            if target <= version:
+                continue
+            logger.info("migrating schema to version %d", target)
+            step(connection)
+            _set_version(connection, target)
+            connection.commit()
+            version = target
+    return version
+
+
+# Lifespan hook: runs ensure_schema on a thread, since waiting for another
+# worker's migration lock would otherwise block the event loop, retrying while
+# the database is unreachable for up to SCHEMA_WAIT_SECONDS
+async def bootstrap_schema(wait: float = SCHEMA_WAIT_SECONDS) -> int:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    delay = 0.5
+    while True:
+        try:
+            return await asyncio.to_thread(migrate)
+        except OperationalError:
+            if loop.time() + delay > deadline:
+                raise
+            logger.warning("database unavailable, retrying schema bootstrap in %.1fs", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 5)
+
+
+# Blocking variant for scripts and jobs
+def migrate(bind=engine) -> int:
+    with bind.connect() as connection:
+        return ensure_schema(connection)
+
+
+if __name__ == "__main__":
+    print(f"Schema is at version {migrate()}.")
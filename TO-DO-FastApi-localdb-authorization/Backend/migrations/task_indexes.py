@@ -0,0 +1,23 @@
+from sqlalchemy import inspect
+from config.db import engine
+from models.index import Task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Build the owner-scoped task indexes on a database created before they existed.
+# Safe to re-run: indexes that are already present are skipped.
+def upgrade(connection):
+    existing = {index["name"] for index in inspect(connection).get_indexes(Task.__tablename__)}
+    for index in Task.__table__.indexes:
+        if index.name not in existing:
+            logger.info("Creating index %s", index.name)
+            index.create(bind=connection)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with engine.begin() as connection:
+        upgrade(connection)
+    logger.info("Task indexes are up to date.")
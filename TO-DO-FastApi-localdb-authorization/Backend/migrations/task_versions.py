@@ -0,0 +1,26 @@
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+from config.db import engine
+from models.index import Task, User
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Add the ETag and delta sync version counters to a database created before they existed.
+# Safe to re-run: columns that are already present are skipped.
+def upgrade(connection):
+    inspector = inspect(connection)
+    for column in (Task.__table__.c.version, Task.__table__.c.change_version, User.__table__.c.task_version, User.__table__.c.sync_floor):
+        table = column.table.name
+        if column.name not in {existing["name"] for existing in inspector.get_columns(table)}:
+            logger.info("Adding column %s.%s", table, column.name)
+            ddl = CreateColumn(column).compile(dialect=connection.dialect)
+            connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with engine.begin() as connection:
+        upgrade(connection)
+    logger.info("Task version columns are up to date.")
@@ -1,4 +1,4 @@
 from sqlalchemy import MetaData
-from models.model import Task,User
+from models.model import Task,User,TaskStats,TaskTombstone,IdempotencyKey,SchemaVersion
 
 meta=MetaData()
\ No newline at end of file
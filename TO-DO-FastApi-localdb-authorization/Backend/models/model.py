@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, VARCHAR, Boolean, DateTime, UniqueConstraint, ForeignKey
+from sqlalchemy import Column, Integer, VARCHAR, Boolean, DateTime, LargeBinary, UniqueConstraint, ForeignKey, Index, event, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from config.db import Base
+from utils.identity_cache import identity_cache
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -14,12 +15,31 @@ class Task(Base):
     updated_at = Column(DateTime,default=datetime.now)
     deadline = Column(DateTime,nullable=False)
     owner_id = Column(Integer, ForeignKey("users.user_id"))  # Updated foreign key reference
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every update, backs the task ETag
+    change_version = Column(Integer, nullable=False, default=0, server_default="0")  # Owner's task_version at the row's last write, backs delta sync
 
     # Define relationship with User
     user = relationship("User", back_populates="tasks")
 
     __table_args__ = (
         UniqueConstraint("title", name="uq_task_title"),  # Explicit uniqueness
+        # Owner-scoped lookups and keyset pages ordered by task_id
+        Index("ix_tasks_owner_task", "owner_id", "task_id"),
+        # Owner-scoped keyset pages ordered by deadline or title (see utils/pagination.py)
+        Index("ix_tasks_owner_deadline_task", "owner_id", "deadline", "task_id"),
+        Index("ix_tasks_owner_title_task", "owner_id", "title", "task_id"),
+        # Per-owner status filters and deadline ranges
+        Index("ix_tasks_owner_status_deadline", "owner_id", "status", "deadline"),
+        # Open tasks by deadline; MySQL has no partial indexes and relies on the one above
+        Index(
+            "ix_tasks_open_deadline", "owner_id", "deadline",
+            sqlite_where=text("status = 0"),
+            postgresql_where=text("status = false"),
+        ).ddl_if(dialect=("sqlite", "postgresql")),
+        # Upcoming deadlines across all owners, read a window at a time by the reminder scheduler
+        Index("ix_tasks_status_deadline", "status", "deadline"),
+        # Rows an owner changed after a sync cursor
+        Index("ix_tasks_owner_change", "owner_id", "change_version"),
     )
 
 class User(Base):
@@ -28,6 +48,8 @@ class User(Base):
     user_id = Column(Integer, primary_key=True, index=True,autoincrement=True)
     user_name = Column(VARCHAR(50), unique=True, nullable=False)  # Unique name constraint
     user_password = Column(VARCHAR(255), nullable=False)
+    task_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every task write, backs the list ETag
+    sync_floor = Column(Integer, nullable=False, default=0, server_default="0")  # Oldest cursor delta sync can still serve once tombstones are pruned
 
     # Define relationship with Task
     tasks = relationship("Task", back_populates="user", cascade="all, delete")
@@ -35,3 +57,51 @@ class User(Base):
     __table_args__ = (
         UniqueConstraint("user_name", name="uq_user_name"),  # Explicit uniqueness
     )
+
+
+# Per-user task counters, kept in step by every task write (see utils/task_stats.py)
+class TaskStats(Base):
+    __tablename__ = "task_stats"
+
+    owner_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0, server_default="0")
+    completed = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+# Deleted tasks, kept so delta sync can tell clients what to remove
+class TaskTombstone(Base):
+    __tablename__ = "task_tombstones"
+
+    owner_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    change_version = Column(Integer, primary_key=True)
+    task_id = Column(Integer, primary_key=True)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.now)
+
+
+# First response to each Idempotency-Key (see utils/idempotency.py); status_code
+# stays NULL while the first request is still running
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    owner_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    key = Column(VARCHAR(255), primary_key=True)
+    fingerprint = Column(VARCHAR(64), nullable=False)  # sha256 of the request it was first used for
+    status_code = Column(Integer, nullable=True)
+    body = Column(LargeBinary(16 * 1024 * 1024), nullable=True)  # zlib-compressed response body (MEDIUMBLOB on MySQL)
+    etag = Column(VARCHAR(64), nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)  # swept in the background
+
+
+# Single row (id=1) holding the schema version migrations/schema.py last applied
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    applied_at = Column(DateTime, nullable=False, default=datetime.now)
+
+# Drop cached JWT identities whenever a user row changes or goes away
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_cached_identity(mapper, connection, target):
+    identity_cache.invalidate_user(target.user_id)
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException
+from dotenv import load_dotenv
+from config.pool import engine_metrics
+from config.sql_log import sql_log_stats
+from utils.identity_cache import identity_cache
+from utils.response_cache import response_cache
+from utils.compression import compression_metrics
+from utils.deadlines import deadline_scheduler
+from utils.task_stream import task_hub
+from utils.idempotency import idempotency_store
+from routes.routes import get_current_user
+from schemas.schema import CurrentUser
+import os
+
+load_dotenv()
+# Comma-separated user names allowed to read /admin/*; empty means nobody
+ADMIN_USERS = {name.strip() for name in os.getenv("ADMIN_USERS", "").split(",") if name.strip()}
+
+
+# Operational metrics expose SQL, pool and cache internals: admins only
+async def require_admin(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    if current_user.user_name not in ADMIN_USERS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+
+adminRouter = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+# Live connection pool metrics for both engines
+@adminRouter.get('/pool')
+async def pool_metrics():
+    return {name: metrics.snapshot() for name, metrics in engine_metrics.items()}
+
+
+# Slow query counters and the most expensive statements by total time
+@adminRouter.get('/sql')
+async def sql_metrics(limit: int = 20):
+    return sql_log_stats(limit)
+
+
+# Hit ratio and memory use of the in-process caches
+@adminRouter.get('/cache')
+async def cache_metrics():
+    return {"responses": response_cache.stats(), "identities": identity_cache.stats()}
+
+
+# Compression ratio and CPU time per negotiated codec
+@adminRouter.get('/compression')
+async def compression_stats():
+    return compression_metrics.snapshot()
+
+
+# Reminder scheduler state: loaded horizon, heap size and reminders fired
+@adminRouter.get('/deadlines')
+async def deadline_stats():
+    return deadline_scheduler.stats()
+
+
+# SSE fan-out: connected owners and subscribers, events published, slow consumers evicted
+@adminRouter.get('/stream')
+async def stream_stats():
+    return task_hub.stats()
+
+
+# Idempotency-Key replays, coalesced duplicates and expired keys swept
+@adminRouter.get('/idempotency')
+async def idempotency_stats():
+    return idempotency_store.stats()
@@ -1,16 +1,32 @@
-from fastapi import APIRouter, HTTPException, Depends, Body,status
+from fastapi import APIRouter, HTTPException, Depends, Body, Query, Header,status
 from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update, func
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
-from typing import Annotated
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, Literal
 from dependencies import get_db,oauth2_scheme
-from models.index import Task,User
-from schemas.schema import TaskSchema, TaskResponse,UserSchema,UserCreate,TaskDeadlineUpdate,TaskStatusUpdate
+from models.index import Task,User,TaskStats,TaskTombstone
+from schemas.schema import TaskSchema, TaskResponse,UserSchema,UserCreate,TaskDeadlineUpdate,TaskStatusUpdate,CurrentUser,TaskPage,TaskPatch,BulkTaskResponse,TaskStatsResponse,TaskChanges,TaskBatch,TaskBatchResponse
+from utils.identity_cache import identity_cache
+from utils.hashing import hash_password, verify_password
+from utils.bulk import bulk_insert_tasks, TASK_BULK_BATCH_SIZE, TASK_BULK_MAX_ROWS
+from utils.etag import task_etag, list_etag, none_match, not_modified, expected_version, current_task_version, bump_task_version
+from utils.response_cache import response_cache
+from utils.serialization import dump_page, ModelJSONResponse
+from utils.fieldsets import task_fields, task_model, task_list_adapter, task_load_only
+from utils.export import export_tasks, EXPORT_MEDIA_TYPES
+from utils.deadlines import deadline_scheduler
+from utils.sync import read_changes, SYNC_PAGE_SIZE
+from utils.task_stream import task_hub, event_stream
+from utils.idempotency import idempotency_store, request_fingerprint
+from utils.batch import run_batch
+from utils.task_stats import adjust_task_stats, read_task_stats
+from utils.pagination import keyset_paginate, split_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from datetime import datetime, timedelta
 import jwt
-from passlib.context import CryptContext
 
-taskRouter = APIRouter()
+taskRouter = APIRouter(default_response_class=ModelJSONResponse)
 
 
 # JWT Configuration
@@ -19,9 +35,6 @@ SECRET_KEY = "your_secret_key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
-
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     if expires_delta:
@@ -33,12 +46,17 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    # Tokens verified recently resolve without jwt.decode or a users lookup
+    cached_user = identity_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
@@ -47,15 +65,17 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except jwt.PyJWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.user_id == int(user_id)).first()
+    user = (await db.scalars(select(User).where(User.user_id == int(user_id)))).first()
     if user is None:
         raise credentials_exception
-    return user
+    current_user = CurrentUser.model_validate(user)
+    identity_cache.put(token, current_user, exp=payload.get("exp"))
+    return current_user
 
 @taskRouter.post("/register", response_model=UserSchema)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if the username already exists
-    existing_user = db.query(User).filter(User.user_name == user.user_name).first()
+    existing_user = (await db.scalars(select(User).where(User.user_name == user.user_name))).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -63,7 +83,7 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Hash the password before saving
-    hashed_password = pwd_context.hash(user.user_password)
+    hashed_password = await hash_password(user.user_password)
     new_user = User(
         user_name=user.user_name,
         user_password=hashed_password
@@ -71,19 +91,21 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     
     # Save the new user to the database
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.flush()
+    db.add(TaskStats(owner_id=new_user.user_id))
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
 
 @taskRouter.post("/token")
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Retrieve user by username from the database
-    user = db.query(User).filter(User.user_name == form_data.username).first()
+    user = (await db.scalars(select(User).where(User.user_name == form_data.username))).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -92,7 +114,7 @@ def login(
         )
     
     # Verify the password using the hashing context
-    if not pwd_context.verify(form_data.password, user.user_password):
+    if not await verify_password(form_data.password, user.user_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -114,34 +136,127 @@ def login(
 def index():
     return {"msg":"Welcome to the TO DO App using FastAPI"}
 
-# Get all tasks
-@taskRouter.get('/tasks', response_model=list[TaskResponse])
-async def all_tasks(db: Session = Depends(get_db),current_user: User = Depends(get_current_user)):
-    tasks = db.query(Task).filter(Task.owner_id==current_user.user_id).all()
-    return [TaskResponse.model_validate(task) for task in tasks]
+# Get all tasks, one keyset page at a time
+@taskRouter.get('/tasks', response_model=TaskPage)
+async def all_tasks(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    sort: Literal["task_id", "deadline", "title"] = "task_id",
+    order: Literal["asc", "desc"] = "asc",
+    fields: tuple | None = Depends(task_fields),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    # The owner's change counter decides freshness before any task is read
+    task_version = await current_task_version(db, current_user.user_id)
+    params = (limit, cursor, sort, order, fields)
+    etag = list_etag(current_user.user_id, task_version, *params)
+    if none_match(if_none_match, etag):
+        return not_modified(etag)
+
+    body = response_cache.get(current_user.user_id, params, task_version)
+    if body is None:
+        query = select(Task).where(Task.owner_id==current_user.user_id)
+        if fields:
+            # The cursor needs the sort key even when the client did not ask for it
+            query = query.options(task_load_only(fields, "task_id", sort))
+        tasks = (await db.scalars(keyset_paginate(query, sort, order, cursor, limit))).all()
+        tasks, next_cursor = split_page(tasks, sort, order, limit)
+        body = dump_page(tasks, next_cursor, task_list_adapter(fields))
+        response_cache.put(current_user.user_id, params, task_version, body)
+    return ModelJSONResponse(body, headers={"ETag": etag})
+
+
+# Stream every task as NDJSON or CSV without materializing the list
+@taskRouter.get('/tasks/export')
+async def export_all_tasks(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    fields: tuple | None = Depends(task_fields),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return StreamingResponse(
+        export_tasks(db, current_user.user_id, format, fields),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
+
+# Delta sync: only the rows written and deleted after the client's cursor
+@taskRouter.get('/tasks/changes', response_model=TaskChanges)
+async def task_changes(
+    since: int | None = Query(None, ge=0),
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: tuple | None = Depends(task_fields),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return ModelJSONResponse(await read_changes(db, current_user.user_id, since, limit, fields, task_list_adapter(fields)))
+
+
+# Server-Sent Events of the user's task changes; reconnects resume from Last-Event-ID
+@taskRouter.get('/tasks/stream')
+async def stream_tasks(
+    since: int | None = Query(None, ge=0),
+    last_event_id: int | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    if not task_hub.running:
+        raise HTTPException(status_code=503, detail="Task stream is not available")
+    # The stream may stay open for hours; do not keep a pooled connection for it
+    await db.close()
+    subscriber = await task_hub.subscribe(current_user.user_id, last_event_id if last_event_id is not None else since)
+    return StreamingResponse(
+        event_stream(task_hub, subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Dashboard counters, read from task_stats instead of counting every task
+@taskRouter.get('/tasks/stats', response_model=TaskStatsResponse)
+async def task_stats(db: AsyncSession = Depends(get_db), current_user: CurrentUser = Depends(get_current_user)):
+    return ModelJSONResponse(TaskStatsResponse(**await read_task_stats(db, current_user.user_id)))
 
 
 # Get task by ID or Title
 @taskRouter.get('/task/', response_model=TaskResponse)
-async def get_task(id: int | None = None, title: str | None = None, db: Session = Depends(get_db),token:str=Depends(oauth2_scheme),current_user: User = Depends(get_current_user)):
+async def get_task(id: int | None = None, title: str | None = None, fields: tuple | None = Depends(task_fields), if_none_match: str | None = Header(None), db: AsyncSession = Depends(get_db),token:str=Depends(oauth2_scheme),current_user: CurrentUser = Depends(get_current_user)):
     if id:
-        task = db.query(Task).filter(Task.task_id == id).first()
+        match = Task.task_id == id
     elif title:
-        task = db.query(Task).filter(Task.title == title).first()
+        match = Task.title == title
     else:
         raise HTTPException(status_code=400, detail="Please provide either task ID or title")
 
-    if task:
-        if task.owner_id==current_user.user_id:
-            return TaskResponse.model_validate(task)
+    # Read only the version first; a matching If-None-Match never loads the task
+    row = (await db.execute(select(Task.task_id, Task.owner_id, Task.version).where(match))).first()
+    if row:
+        if row.owner_id==current_user.user_id:
+            etag = task_etag(row.task_id, row.version, fields)
+            if none_match(if_none_match, etag):
+                return not_modified(etag)
+            options = [task_load_only(fields)] if fields else []
+            task = await db.get(Task, row.task_id, options=options)
+            return ModelJSONResponse(task_model(fields).model_validate(task), headers={"ETag": etag})
         raise HTTPException(status_code=401,detail="You are unauthorized to see the details of this task")
 
     raise HTTPException(status_code=404, detail="Task not found")
 
 
-# Add a new task
+# Add a new task; retries carrying the same Idempotency-Key replay the first response
 @taskRouter.post('/task/')
-async def add_task(task: TaskSchema, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: User = Depends(get_current_user)):
+async def add_task(task: TaskSchema, idempotency_key: str | None = Header(None, max_length=255), db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: CurrentUser = Depends(get_current_user)):
+    if idempotency_key is None:
+        return await create_task(db, current_user, task)
+    fingerprint = request_fingerprint("POST /task/", task)
+    return await idempotency_store.run(db, current_user.user_id, idempotency_key, fingerprint, lambda record: create_task(db, current_user, task, record))
+
+
+# record, from the idempotency store, saves the response in the same transaction
+async def create_task(db: AsyncSession, current_user: CurrentUser, task: TaskSchema, record=None):
     new_task = Task(
         title=task.title,
         description=task.description,
@@ -154,54 +269,163 @@ async def add_task(task: TaskSchema, db: Session = Depends(get_db), token: str =
 
     try:
         db.add(new_task)
-        db.commit()
-        db.refresh(new_task)
+        new_task.change_version = await bump_task_version(db, current_user.user_id)
+        await adjust_task_stats(db, current_user.user_id, total=1, completed=int(bool(task.status)))
+        await db.flush()
+        await db.refresh(new_task)
         # Convert new_task to a serializable model using TaskResponse
-        return {"message": "Task added successfully", "task": TaskResponse.model_validate(new_task)}
+        response = ModelJSONResponse(
+            {"message": "Task added successfully", "task": TaskResponse.model_validate(new_task)},
+            headers={"ETag": task_etag(new_task.task_id, new_task.version)},
+        )
+        if record is not None:
+            await record(response)
+        await db.commit()
     
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Task with this title already exists")
 
     except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=404,detail=f"Something happened {e}")
+        await db.rollback()
+        raise HTTPException(status_code=500,detail=f"Something happened {e}")
 
-# Update task by ID or Title
-@taskRouter.put('/task/', response_model=TaskResponse)
-async def update_task(
-    id: int | None = None,
-    title: str | None = None,
-    task: TaskSchema = Body(...),
-    db: Session = Depends(get_db)
-    ,token:str=Depends(oauth2_scheme),
-    current_user: User = Depends(get_current_user)
-):
-    query = None
+    deadline_scheduler.task_changed(new_task.task_id, new_task.owner_id, new_task.title, new_task.deadline, new_task.status)
+    return response
 
+# Owner-scoped UPDATE ... RETURNING: one round trip on the happy path.
+# Only a miss pays for a second query to tell "not found" from "not yours"
+# (or, with If-Match, "changed since you read it"). A task addressed by title
+# is first resolved to its id, since the update may rename it.
+async def apply_task_update(db: AsyncSession, owner_id: int, changes: dict, id: int | None, title: str | None, unauthorized_detail: str, if_match: str | None = None):
     if id:
-        query = db.query(Task).filter(Task.task_id == id)
+        task_id = id
     elif title:
-        query = db.query(Task).filter(Task.title == title)
+        task_id = await db.scalar(select(Task.task_id).where(Task.title == title))
+        if task_id is None:
+            raise HTTPException(status_code=404, detail="Task not found")
     else:
         raise HTTPException(status_code=400, detail="Please provide either task ID or title")
 
-    existing_task = query.first()
-    if not existing_task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    elif existing_task.owner_id!=current_user.user_id:
-        raise HTTPException(status_code=401,detail="You are unauthorized to update this task")
+    match = Task.task_id == task_id
+    conditions = [match, Task.owner_id == owner_id]
+    version = expected_version(if_match, task_id)
+    if version is not None:
+        conditions.append(Task.version == version)
+
+    async def run_update(*extra):
+        statement = (
+            update(Task)
+            .where(*conditions, *extra)
+            .values(**changes, version=Task.version + 1, change_version=change_version)
+            .execution_options(synchronize_session=False)
+        )
+        if db.get_bind().dialect.update_returning:
+            return (await db.scalars(statement.returning(Task))).first()
+        # MySQL has no UPDATE ... RETURNING; read the row back by primary key only if it matched
+        if (await db.execute(statement)).rowcount:
+            reread = select(Task).where(match).execution_options(populate_existing=True)
+            return (await db.scalars(reread)).first()
+        return None
 
-    existing_task.title = task.title
-    existing_task.description = task.description
-    existing_task.status = task.status
-    existing_task.updated_at=task.updated_at
-    existing_task.deadline=task.deadline if task.deadline else existing_task.deadline
+    try:
+        # Taking the owner's next change version first also queues this owner's other writers
+        change_version = await bump_task_version(db, owner_id)
+        completed = 0
+        if "status" in changes:
+            # Only a row whose status actually flips moves the completed counter;
+            # the condition is part of the same UPDATE, so there is no read-then-write race
+            new_status = bool(changes["status"])
+            task = await run_update(func.coalesce(Task.status, False) != new_status)
+            if task is not None:
+                completed = 1 if new_status else -1
+            else:
+                task = await run_update()
+        else:
+            task = await run_update()
+        if task is None:
+            await db.rollback()
+        else:
+            await adjust_task_stats(db, owner_id, completed=completed)
+            await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Task with this title already exists")
 
-    db.commit()
-    db.refresh(existing_task)
-    return TaskResponse.model_validate(existing_task)
+    if task is None:
+        row = (await db.execute(select(Task.owner_id).where(match))).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        if row.owner_id != owner_id:
+            raise HTTPException(status_code=401, detail=unauthorized_detail)
+        raise HTTPException(status_code=412, detail="Precondition failed: task has changed")
+    deadline_scheduler.task_changed(task.task_id, task.owner_id, task.title, task.deadline, task.status)
+    return ModelJSONResponse(TaskResponse.model_validate(task), headers={"ETag": task_etag(task.task_id, task.version)})
+
+
+# Add many tasks at once; title conflicts are reported per row
+@taskRouter.post('/tasks/bulk', response_model=BulkTaskResponse)
+async def add_tasks_bulk(
+    tasks: list[TaskSchema] = Body(..., max_length=TASK_BULK_MAX_ROWS),
+    batch_size: int = Query(TASK_BULK_BATCH_SIZE, ge=1, le=TASK_BULK_MAX_ROWS),
+    idempotency_key: str | None = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    if idempotency_key is None:
+        return await create_tasks_bulk(db, current_user, tasks, batch_size)
+    fingerprint = request_fingerprint("POST /tasks/bulk", batch_size, *tasks)
+    return await idempotency_store.run(db, current_user.user_id, idempotency_key, fingerprint, lambda record: create_tasks_bulk(db, current_user, tasks, batch_size, record))
+
+
+async def create_tasks_bulk(db: AsyncSession, current_user: CurrentUser, tasks: list[TaskSchema], batch_size: int, record=None):
+    results = await bulk_insert_tasks(db, current_user.user_id, tasks, batch_size, commit=False)
+    created = sum(1 for result in results if result["status"] == "created")
+    response = ModelJSONResponse({"created": created, "conflicts": len(results) - created, "results": results})
+    if record is not None:
+        await record(response)
+    await db.commit()
+    created_ids = [result["task_id"] for result in results if result["status"] == "created"]
+    if created_ids:
+        # The stored rows, not the request: the column keeps deadlines naive, as
+        # the scheduler compares them, even when the client sent an offset
+        rows = await db.execute(select(Task.task_id, Task.owner_id, Task.title, Task.deadline, Task.status).where(Task.task_id.in_(created_ids)))
+        for row in rows:
+            deadline_scheduler.task_changed(*row)
+    return response
+
+# Many creates/updates/patches/deletes in one transaction, e.g. a client's offline queue
+@taskRouter.post('/tasks/batch', response_model=TaskBatchResponse)
+async def task_batch(batch: TaskBatch, db: AsyncSession = Depends(get_db), current_user: CurrentUser = Depends(get_current_user)):
+    committed, results, written, deleted = await run_batch(db, current_user.user_id, batch.operations, batch.atomic)
+    if written:
+        rows = await db.execute(select(Task.task_id, Task.owner_id, Task.title, Task.deadline, Task.status).where(Task.task_id.in_(written)))
+        for row in rows:
+            deadline_scheduler.task_changed(*row)
+    for task_id in deleted:
+        deadline_scheduler.task_deleted(task_id)
+    status_code = 409 if batch.atomic and not committed and results else 200
+    return ModelJSONResponse({"committed": committed, "results": results}, status_code=status_code)
+
+# Update task by ID or Title
+@taskRouter.put('/task/', response_model=TaskResponse)
+async def update_task(
+    id: int | None = None,
+    title: str | None = None,
+    task: TaskSchema = Body(...),
+    if_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db)
+    ,token:str=Depends(oauth2_scheme),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    changes = {
+        "title": task.title,
+        "description": task.description,
+        "status": task.status,
+        "updated_at": task.updated_at,
+        "deadline": task.deadline,
+    }
+    return await apply_task_update(db, current_user.user_id, changes, id, title, "You are unauthorized to update this task", if_match)
 
 
 
@@ -210,64 +434,58 @@ async def update_status(
     id: int | None = None,
     title: str | None = None,
     update: TaskStatusUpdate = Body(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    if_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    if id:
-        query = db.query(Task).filter(Task.task_id == id)
-    elif title:
-        query = db.query(Task).filter(Task.title == title)
-    else:
-        raise HTTPException(status_code=400, detail="Please provide either task ID or title")
-    existing_task = query.first()
-    if not existing_task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    if existing_task.owner_id != current_user.user_id:
-        raise HTTPException(status_code=401, detail="You are unauthorized to update status of this task")
-    
-    existing_task.status = update.status
-    db.commit()
-    db.refresh(existing_task)
-    return TaskResponse.model_validate(existing_task)
+    return await apply_task_update(db, current_user.user_id, {"status": update.status}, id, title, "You are unauthorized to update status of this task", if_match)
 
 @taskRouter.patch('/task/deadline', response_model=TaskResponse)
 async def update_deadline(
     id: int | None = None,
     title: str | None = None,
     update: TaskDeadlineUpdate = Body(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    if_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    if id:
-        query = db.query(Task).filter(Task.task_id == id)
-    elif title:
-        query = db.query(Task).filter(Task.title == title)
-    else:
-        raise HTTPException(status_code=400, detail="Please provide either task ID or title")
-    existing_task = query.first()
-    if not existing_task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    if existing_task.owner_id != current_user.user_id:
-        raise HTTPException(status_code=401, detail="You are unauthorized to update deadline of this task")
-    
-    existing_task.deadline = update.deadline
-    db.commit()
-    db.refresh(existing_task)
-    return TaskResponse.model_validate(existing_task)
+    return await apply_task_update(db, current_user.user_id, {"deadline": update.deadline}, id, title, "You are unauthorized to update deadline of this task", if_match)
+
+# Sparse update: only the fields present in the body are written
+@taskRouter.patch('/task/{id}', response_model=TaskResponse)
+async def patch_task(
+    id: int,
+    patch: TaskPatch = Body(...),
+    if_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    changes = patch.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="Please provide at least one field to update")
+    changes["updated_at"] = datetime.now()
+    return await apply_task_update(db, current_user.user_id, changes, id, None, "You are unauthorized to update this task", if_match)
 
 @taskRouter.delete('/task/', response_model=dict)
-async def delete_task(id: int | None = None, title: str | None = None, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def delete_task(id: int | None = None, title: str | None = None, if_match: str | None = Header(None), db: AsyncSession = Depends(get_db), current_user: CurrentUser = Depends(get_current_user)):
     if id:
-        query = db.query(Task).filter(Task.task_id == id)
+        query = select(Task).where(Task.task_id == id)
     elif title:
-        query = db.query(Task).filter(Task.title == title)
+        query = select(Task).where(Task.title == title)
     else:
         raise HTTPException(status_code=400, detail="Please provide either task ID or title")
-    task = query.first()
+    task = (await db.scalars(query)).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     if task.owner_id != current_user.user_id:
         raise HTTPException(status_code=401, detail="You are unauthorized to delete this task")
-    db.delete(task)
-    db.commit()
+    version = expected_version(if_match, task.task_id)
+    if version is not None and version != task.version:
+        raise HTTPException(status_code=412, detail="Precondition failed: task has changed")
+    await db.delete(task)
+    change_version = await bump_task_version(db, current_user.user_id)
+    db.add(TaskTombstone(owner_id=current_user.user_id, change_version=change_version, task_id=task.task_id))
+    await adjust_task_stats(db, current_user.user_id, total=-1, completed=-int(bool(task.status)))
+    await db.commit()
+    deadline_scheduler.task_deleted(task.task_id)
     return {"message": "Task deleted successfully"}
\ No newline at end of file
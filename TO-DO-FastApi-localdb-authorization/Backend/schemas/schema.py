@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Literal, Annotated, Union
+from utils.batch import TASK_BATCH_MAX_OPS
 
 # Pydantic model for Task (used for request data)
 class TaskSchema(BaseModel):
@@ -21,6 +22,15 @@ class UserCreate(BaseModel):
     user_name: str
     user_password: str
 
+# Identity resolved from a verified JWT (safe to cache across requests)
+class CurrentUser(BaseModel):
+    user_id: int
+    user_name: str
+
+    model_config = {
+        "from_attributes": True
+    }
+
 class UserSchema(BaseModel):
     user_id: int
     user_name: str
@@ -45,8 +55,94 @@ class TaskResponse(BaseModel):
         "from_attributes": True
     }
 
+# One page of tasks; pass next_cursor back as ?cursor= to fetch the next one
+class TaskPage(BaseModel):
+    tasks: list[TaskResponse]
+    next_cursor: Optional[str] = None
+
+# Tasks changed and deleted since a sync cursor; pass version back as ?since=
+class TaskChanges(BaseModel):
+    tasks: list[TaskResponse]
+    deleted: list[int]
+    version: int
+    has_more: bool
+
+# Per-row outcome of POST /tasks/bulk
+class BulkTaskResult(BaseModel):
+    index: int
+    status: Literal["created", "conflict"]
+    task_id: Optional[int] = None
+
+class BulkTaskResponse(BaseModel):
+    created: int
+    conflicts: int
+    results: list[BulkTaskResult]
+
+# Dashboard counters for GET /tasks/stats
+class TaskStatsResponse(BaseModel):
+    total: int
+    completed: int
+    open: int
+    overdue: int
+
 class TaskStatusUpdate(BaseModel):
     status: bool
 
 class TaskDeadlineUpdate(BaseModel):
     deadline: datetime
+
+# Sparse update: any subset of the editable fields
+class TaskPatch(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[bool] = None
+    deadline: Optional[datetime] = None
+
+    model_config = {
+        "extra": "forbid"
+    }
+
+    @model_validator(mode="after")
+    def reject_null_required_fields(self):
+        for field in ("title", "status", "deadline"):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f"{field} cannot be null")
+        return self
+
+
+# One entry of POST /tasks/batch, told apart by "op"
+class TaskCreateOp(BaseModel):
+    op: Literal["create"]
+    task: TaskSchema
+
+class TaskUpdateOp(BaseModel):
+    op: Literal["update"]
+    id: int
+    task: TaskSchema
+
+class TaskPatchOp(BaseModel):
+    op: Literal["patch"]
+    id: int
+    changes: TaskPatch
+
+class TaskDeleteOp(BaseModel):
+    op: Literal["delete"]
+    id: int
+
+TaskOperation = Annotated[Union[TaskCreateOp, TaskUpdateOp, TaskPatchOp, TaskDeleteOp], Field(discriminator="op")]
+
+# atomic: all operations commit or none do; otherwise failed ones are skipped
+class TaskBatch(BaseModel):
+    atomic: bool = True
+    operations: list[TaskOperation] = Field(max_length=TASK_BATCH_MAX_OPS)
+
+# Per-operation outcome, status as the matching single-task route would answer
+class TaskBatchResult(BaseModel):
+    index: int
+    status: int
+    task_id: Optional[int] = None
+    detail: Optional[str] = None
+
+class TaskBatchResponse(BaseModel):
+    committed: bool
+    results: list[TaskBatchResult]
@@ -0,0 +1,152 @@
+# The same pre-fork launcher ships with TO-DO-FastApi and Fast-api-sql (each app
+# is installed on its own); only configure_worker and the app string differ, so
+# keep the Supervisor in the three copies in sync.
+from dotenv import load_dotenv
+from config.db import before_fork, after_fork
+from utils.deadlines import deadline_scheduler, DEADLINE_SCHEDULER_ENABLED
+from utils.hashing import hashing_pool
+import importlib.util
+import logging
+import signal
+import time
+import gc
+import os
+import uvicorn
+
+load_dotenv()
+
+
+def _cpu_count() -> int:
+    # Cores this process may run on (honours taskset/cgroup cpusets), not the whole box
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# The fast implementation when it is installed, else the pure-Python fallback
+def _pick(preferred: str, fallback: str) -> str:
+    return preferred if importlib.util.find_spec(preferred) else fallback
+
+
+SERVE_HOST = os.getenv("SERVE_HOST", "0.0.0.0")
+SERVE_PORT = int(os.getenv("SERVE_PORT", "8000"))
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", "0")) or _cpu_count()
+SERVE_LOOP = os.getenv("SERVE_LOOP") or _pick("uvloop", "asyncio")
+SERVE_HTTP = os.getenv("SERVE_HTTP") or _pick("httptools", "h11")
+SERVE_BACKLOG = int(os.getenv("SERVE_BACKLOG", "2048"))
+SERVE_KEEPALIVE_SECONDS = int(os.getenv("SERVE_KEEPALIVE_SECONDS", "5"))
+SERVE_MAX_REQUESTS = int(os.getenv("SERVE_MAX_REQUESTS", "0"))  # 0 = workers are never recycled
+SERVE_MAX_REQUESTS_JITTER = int(os.getenv("SERVE_MAX_REQUESTS_JITTER", "0"))
+SERVE_GRACEFUL_SECONDS = int(os.getenv("SERVE_GRACEFUL_SECONDS", "30"))
+
+logger = logging.getLogger("uvicorn.error")
+
+
+# Runs in each forked worker before its lifespan. Worker 0 alone runs the
+# deadline scheduler, so a reminder fires once rather than once per worker, and
+# unless HASH_POOL_WORKERS is set the cores are split between the workers'
+# hashing pools instead of every worker starting its own full-size pool.
+def configure_worker(index: int, workers: int):
+    after_fork()
+    if index != 0:
+        deadline_scheduler.enabled = False
+    if "HASH_POOL_WORKERS" not in os.environ:
+        hashing_pool.workers = max(1, _cpu_count() // workers)
+
+
+def server_options() -> dict:
+    return dict(
+        host=SERVE_HOST,
+        port=SERVE_PORT,
+        loop=SERVE_LOOP,
+        http=SERVE_HTTP,
+        backlog=SERVE_BACKLOG,
+        timeout_keep_alive=SERVE_KEEPALIVE_SECONDS,
+        limit_max_requests=SERVE_MAX_REQUESTS or None,
+        limit_max_requests_jitter=SERVE_MAX_REQUESTS_JITTER,
+        timeout_graceful_shutdown=SERVE_GRACEFUL_SECONDS,
+    )
+
+
+# Pre-fork supervisor. The master imports the app once, binds the socket, and
+# freezes everything allocated so far out of the cyclic GC, so the workers'
+# collections never write to (and un-share) those copy-on-write pages. Each
+# worker gets a stable index, is set up by on_worker(index, workers) and runs
+# the lifespan itself. A worker leaving after its max-requests share is
+# replaced under the same index; SIGTERM/SIGINT drain all.
+class Supervisor:
+    def __init__(self, config: uvicorn.Config, workers: int, on_worker=configure_worker):
+        self.config = config
+        self.workers = workers
+        self.on_worker = on_worker
+        self.children = {}  # pid -> (index, start time)
+        self.stopping = False
+
+    def run(self):
+        self.config.load()
+        sock = self.config.bind_socket()
+        before_fork()
+        gc.freeze()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        logger.info("Starting %d workers (loop=%s, http=%s)", self.workers, SERVE_LOOP, SERVE_HTTP)
+        for index in range(self.workers):
+            self._spawn(sock, index)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            child = self.children.pop(pid, None)
+            if child is None or self.stopping:
+                continue
+            index, started = child
+            if os.waitstatus_to_exitcode(status) != 0 and time.monotonic() - started < 1:
+                # Crashing at startup; don't respawn in a tight loop
+                time.sleep(1)
+            self._spawn(sock, index)
+        sock.close()
+
+    def _spawn(self, sock, index: int):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = (index, time.monotonic())
+            return
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            self.on_worker(index, self.workers)
+            server = uvicorn.Server(self.config)
+            server.run(sockets=[sock])
+            if not server.started:
+                code = 3  # startup failed, e.g. the lifespan raised
+        except BaseException:
+            logger.exception("Worker %d failed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def main():
+    if not hasattr(os, "fork"):
+        # Windows: uvicorn's own spawned workers; there are no shared pages to keep.
+        # They are not numbered, so each would run its own deadline scheduler.
+        if DEADLINE_SCHEDULER_ENABLED and SERVE_WORKERS > 1:
+            logger.warning("Deadline reminders fire once per worker; set DEADLINE_SCHEDULER_ENABLED=false on all but one instance")
+        uvicorn.run("app:app", workers=SERVE_WORKERS, **server_options())
+        return
+    Supervisor(uvicorn.Config("app:app", **server_options()), SERVE_WORKERS).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+from sqlalchemy import select, insert, update, delete, bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+from datetime import datetime
+from models.index import Task, TaskTombstone
+from utils.bulk import insert_tasks, TASK_BULK_BATCH_SIZE
+from utils.etag import bump_task_version
+from utils.task_stats import adjust_task_stats
+import os
+
+load_dotenv()
+TASK_BATCH_MAX_OPS = int(os.getenv("TASK_BATCH_MAX_OPS", "500"))
+
+_tasks = Task.__table__
+
+
+def _failed(index: int, status: int, task_id: int | None, detail: str) -> dict:
+    return {"index": index, "status": status, "task_id": task_id, "detail": detail}
+
+
+# Column values an update/patch operation writes, as the single-task routes would
+def _changes(op) -> dict:
+    if op.op == "update":
+        task = op.task
+        return {"title": task.title, "description": task.description, "status": task.status, "updated_at": task.updated_at, "deadline": task.deadline}
+    changes = op.changes.model_dump(exclude_unset=True)
+    if changes:
+        changes["updated_at"] = datetime.now()
+    return changes
+
+
+# Consecutive operations that can share one statement: creates, deletes, and
+# updates/patches writing the same set of columns. Order is kept across groups.
+def _groups(operations, results):
+    groups = []
+    for index, op in enumerate(operations):
+        if op.op in ("update", "patch"):
+            changes = _changes(op)
+            if not changes:
+                results[index] = _failed(index, 400, op.id, "Please provide at least one field to update")
+                continue
+            key = ("write", tuple(sorted(changes)))
+            item = (index, op, changes)
+        else:
+            key = (op.op,)
+            item = (index, op, None)
+        if groups and groups[-1][0] == key:
+            groups[-1][1].append(item)
+        else:
+            groups.append((key, [item]))
+    return groups
+
+
+class _Batch:
+    def __init__(self, db: AsyncSession, owner_id: int, change_version: int, results: list):
+        self.db = db
+        self.owner_id = owner_id
+        self.change_version = change_version
+        self.results = results
+        self.total = 0
+        self.completed = 0
+        self.written = set()
+        self.deleted = []
+
+    # task_id -> (owner_id, status) for the ids a group touches. The owner's
+    # users row is locked by the version bump, so no other write of this owner
+    # can change them before commit.
+    async def _current(self, items) -> dict:
+        ids = {op.id for _, op, _ in items}
+        rows = await self.db.execute(select(Task.task_id, Task.owner_id, Task.status).where(Task.task_id.in_(ids)))
+        return {row.task_id: (row.owner_id, bool(row.status)) for row in rows}
+
+    def _check(self, index: int, task_id: int, current: dict) -> bool:
+        row = current.get(task_id)
+        if row is None:
+            self.results[index] = _failed(index, 404, task_id, "Task not found")
+            return False
+        if row[0] != self.owner_id:
+            self.results[index] = _failed(index, 401, task_id, "You are unauthorized to change this task")
+            return False
+        return True
+
+    async def create(self, items):
+        tasks = [op.task for _, op, _ in items]
+        outcomes = await insert_tasks(self.db, self.owner_id, tasks, TASK_BULK_BATCH_SIZE, self.change_version)
+        for (index, op, _), outcome in zip(items, outcomes):
+            if outcome["status"] == "created":
+                self.results[index] = {"index": index, "status": 200, "task_id": outcome["task_id"]}
+                self.written.add(outcome["task_id"])
+                self.total += 1
+                self.completed += int(bool(op.task.status))
+            else:
+                self.results[index] = _failed(index, 400, None, "Task with this title already exists")
+
+    # One executemany UPDATE for the group; a title conflict falls back to
+    # row-by-row savepoints to find the offending operations
+    async def write(self, items, columns):
+        current = await self._current(items)
+        valid = [(index, op, changes) for index, op, changes in items if self._check(index, op.id, current)]
+        if not valid:
+            return
+        statement = (
+            update(_tasks)
+            .where(_tasks.c.task_id == bindparam("b_task_id"), _tasks.c.owner_id == self.owner_id)
+            .values({
+                **{column: bindparam(f"b_{column}") for column in columns},
+                "version": _tasks.c.version + 1,
+                "change_version": self.change_version,
+            })
+        )
+        params = [{"b_task_id": op.id, **{f"b_{column}": value for column, value in changes.items()}} for _, op, changes in valid]
+        try:
+            async with self.db.begin_nested():
+                await self.db.execute(statement, params)
+            applied = valid
+        except IntegrityError:
+            applied = []
+            for item, row in zip(valid, params):
+                try:
+                    async with self.db.begin_nested():
+                        await self.db.execute(statement, [row])
+                    applied.append(item)
+                except IntegrityError:
+                    self.results[item[0]] = _failed(item[0], 400, item[1].id, "Task with this title already exists")
+
+        for index, op, changes in applied:
+            self.results[index] = {"index": index, "status": 200, "task_id": op.id}
+            self.written.add(op.id)
+            if "status" in changes:
+                owner_id, status = current[op.id]
+                self.completed += int(bool(changes["status"])) - int(status)
+                current[op.id] = (owner_id, bool(changes["status"]))
+
+    async def delete(self, items):
+        current = await self._current(items)
+        removed = {}
+        for index, op, _ in items:
+            if self._check(index, op.id, current):
+                removed[op.id] = current.pop(op.id)[1]
+                self.results[index] = {"index": index, "status": 200, "task_id": op.id}
+        if not removed:
+            return
+        await self.db.execute(
+            delete(Task).where(Task.task_id.in_(removed), Task.owner_id == self.owner_id).execution_options(synchronize_session=False)
+        )
+        await self.db.execute(insert(TaskTombstone), [
+            {"owner_id": self.owner_id, "change_version": self.change_version, "task_id": task_id, "deleted_at": datetime.now()}
+            for task_id in removed
+        ])
+        self.total -= len(removed)
+        self.completed -= sum(removed.values())
+        self.deleted.extend(removed)
+        self.written.difference_update(removed)
+
+
+# Runs the operations in order in one transaction under one change version.
+# atomic: the first failing operation rolls everything back and the others
+# report 424; otherwise failures are skipped and the rest commit.
+# Returns (committed, results, written task ids, deleted task ids).
+async def run_batch(db: AsyncSession, owner_id: int, operations, atomic: bool = True):
+    results = [None] * len(operations)
+    change_version = await bump_task_version(db, owner_id)
+    batch = _Batch(db, owner_id, change_version, results)
+    groups = _groups(operations, results)
+    failed = atomic and any(results)
+    for key, items in groups:
+        if failed:
+            break
+        if key[0] == "create":
+            await batch.create(items)
+        elif key[0] == "delete":
+            await batch.delete(items)
+        else:
+            await batch.write(items, key[1])
+        failed = atomic and any(results[index]["status"] >= 400 for index, _, _ in items)
+
+    if failed or not (batch.written or batch.deleted):
+        await db.rollback()
+        if failed:
+            for index, result in enumerate(results):
+                if result is None or result["status"] < 400:
+                    results[index] = _failed(index, 424, result and result["task_id"], "Not applied: another operation in the batch failed")
+        return False, results, set(), []
+
+    await adjust_task_stats(db, owner_id, total=batch.total, completed=batch.completed)
+    await db.commit()
+    return True, results, batch.written, batch.deleted
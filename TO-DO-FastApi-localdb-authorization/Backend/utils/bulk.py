@@ -0,0 +1,92 @@
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+from models.index import Task
+from utils.etag import bump_task_version
+from utils.task_stats import adjust_task_stats
+import os
+
+load_dotenv()
+TASK_BULK_BATCH_SIZE = int(os.getenv("TASK_BULK_BATCH_SIZE", "500"))
+TASK_BULK_MAX_ROWS = int(os.getenv("TASK_BULK_MAX_ROWS", "10000"))
+
+
+def _row(task, owner_id: int, change_version: int = 0) -> dict:
+    return {
+        "title": task.title,
+        "description": task.description,
+        "status": task.status,
+        "created_at": task.created_at,
+        "updated_at": task.updated_at,
+        "deadline": task.deadline,
+        "owner_id": owner_id,
+        "change_version": change_version,
+    }
+
+
+async def _existing_titles(db: AsyncSession, titles) -> set:
+    return set((await db.scalars(select(Task.title).where(Task.title.in_(titles)))).all())
+
+
+# Insert one chunk with a single executemany. If a concurrent writer took one of
+# the titles in the meantime, fall back to row-by-row savepoints for this chunk.
+async def _insert_chunk(db: AsyncSession, rows: list[dict]) -> set:
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(Task), rows)
+        return set()
+    except IntegrityError:
+        conflicts = set()
+        for row in rows:
+            try:
+                async with db.begin_nested():
+                    await db.execute(insert(Task), [row])
+            except IntegrityError:
+                conflicts.add(row["title"])
+        return conflicts
+
+
+# Returns one {"index", "status", "task_id"} entry per input row, in input order.
+# Title conflicts are reported per row instead of failing the batch. Rows are
+# stamped with change_version; the caller bumps it and commits.
+async def insert_tasks(db: AsyncSession, owner_id: int, tasks, batch_size: int = TASK_BULK_BATCH_SIZE, change_version: int = 0) -> list[dict]:
+    results = [None] * len(tasks)
+    seen = set()
+    for start in range(0, len(tasks), batch_size):
+        chunk = list(enumerate(tasks[start:start + batch_size], start))
+        taken = await _existing_titles(db, [task.title for _, task in chunk])
+        pending = []
+        for index, task in chunk:
+            if task.title in taken or task.title in seen:
+                results[index] = {"index": index, "status": "conflict", "task_id": None}
+            else:
+                seen.add(task.title)
+                pending.append((index, task))
+        if not pending:
+            continue
+
+        conflicts = await _insert_chunk(db, [_row(task, owner_id, change_version) for _, task in pending])
+        ids = dict((await db.execute(
+            select(Task.title, Task.task_id).where(Task.owner_id == owner_id, Task.title.in_([task.title for _, task in pending]))
+        )).all())
+        for index, task in pending:
+            if task.title in conflicts:
+                results[index] = {"index": index, "status": "conflict", "task_id": None}
+            else:
+                results[index] = {"index": index, "status": "created", "task_id": ids.get(task.title)}
+    return results
+
+
+# commit=False leaves a successful insert's transaction open for the caller
+async def bulk_insert_tasks(db: AsyncSession, owner_id: int, tasks, batch_size: int = TASK_BULK_BATCH_SIZE, commit: bool = True) -> list[dict]:
+    change_version = await bump_task_version(db, owner_id)
+    results = await insert_tasks(db, owner_id, tasks, batch_size, change_version)
+    created = [task for task, result in zip(tasks, results) if result["status"] == "created"]
+    if created:
+        await adjust_task_stats(db, owner_id, total=len(created), completed=sum(1 for task in created if task.status))
+        if commit:
+            await db.commit()
+    else:
+        await db.rollback()
+    return results
@@ -0,0 +1,213 @@
+from starlette.datastructures import Headers, MutableHeaders
+from dotenv import load_dotenv
+import threading
+import time
+import zlib
+import os
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+load_dotenv()
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_PROFILE = os.getenv("COMPRESSION_PROFILE", "balanced")
+
+# Level per codec for each profile
+COMPRESSION_PROFILES = {
+    "fast": {"zstd": 1, "br": 1, "gzip": 1},
+    "balanced": {"zstd": 3, "br": 4, "gzip": 6},
+    "max": {"zstd": 19, "br": 11, "gzip": 9},
+}
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Server-Sent Events must reach the client event by event, uncompressed
+INCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+# Server preference order, limited to the codecs importable here
+CODECS = {"gzip": _Gzip}
+if brotli is not None:
+    CODECS = {"br": _Brotli, **CODECS}
+if zstandard is not None:
+    CODECS = {"zstd": _Zstd, **CODECS}
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in CODECS:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+# Bytes and CPU time per codec, to tune COMPRESSION_MIN_SIZE and the profile
+class CompressionMetrics:
+    def __init__(self):
+        self._codecs = {}
+        self.skipped_small = 0
+        self._lock = threading.Lock()
+
+    def record(self, coding: str, bytes_in: int, bytes_out: int, seconds: float, responses: int = 0):
+        with self._lock:
+            entry = self._codecs.setdefault(coding, {"responses": 0, "bytes_in": 0, "bytes_out": 0, "cpu_seconds": 0.0})
+            entry["responses"] += responses
+            entry["bytes_in"] += bytes_in
+            entry["bytes_out"] += bytes_out
+            entry["cpu_seconds"] += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            codecs = {coding: dict(entry) for coding, entry in self._codecs.items()}
+        for entry in codecs.values():
+            entry["ratio"] = entry["bytes_out"] / entry["bytes_in"] if entry["bytes_in"] else 0.0
+        return {
+            "profile": COMPRESSION_PROFILE,
+            "min_size": COMPRESSION_MIN_SIZE,
+            "available": list(CODECS),
+            "skipped_small": self.skipped_small,
+            "codecs": codecs,
+        }
+
+
+compression_metrics = CompressionMetrics()
+
+
+# A strong ETag names exact bytes, so an encoded body only keeps a weak one
+def weaken_etag(headers: MutableHeaders):
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+# Negotiates zstd/br/gzip from Accept-Encoding. Complete bodies under
+# min_size go out as-is; streamed bodies are compressed chunk by chunk and
+# flushed as they go, so StreamingResponse output is never buffered.
+# Compressed responses, and 304s to requests that could get one, carry a
+# weak ETag, which If-None-Match still matches.
+class CompressionMiddleware:
+    def __init__(self, app, min_size: int = COMPRESSION_MIN_SIZE, profile: str = COMPRESSION_PROFILE):
+        self.app = app
+        self.min_size = min_size
+        self.levels = COMPRESSION_PROFILES[profile]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                content_type = headers.get("content-type", "")
+                if start_message["status"] == 304:
+                    weaken_etag(headers)
+                if (
+                    "content-encoding" in headers
+                    or start_message["status"] in (204, 206, 304)
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                    or content_type.startswith(INCOMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.min_size:
+                    compression_metrics.skipped_small += 1
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = CODECS[coding](self.levels[coding])
+                headers["Content-Encoding"] = coding
+                weaken_etag(headers)
+                del headers["Content-Length"]
+                if not more_body:
+                    started = time.perf_counter()
+                    compressed = compressor.compress(body) + compressor.finish()
+                    compression_metrics.record(coding, len(body), len(compressed), time.perf_counter() - started, responses=1)
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                compression_metrics.record(coding, 0, 0, 0.0, responses=1)
+                await send(start_message)
+
+            started = time.perf_counter()
+            compressed = compressor.compress(body) if body else b""
+            if not more_body:
+                compressed += compressor.finish()
+            compression_metrics.record(coding, len(body), len(compressed), time.perf_counter() - started)
+            await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
@@ -0,0 +1,194 @@
+from sqlalchemy import select, or_, and_, false
+from dotenv import load_dotenv
+from datetime import datetime, timedelta
+from config.db import AsyncSessionLocal
+from models.index import Task
+import asyncio
+import inspect
+import logging
+import heapq
+import os
+
+load_dotenv()
+DEADLINE_SCHEDULER_ENABLED = os.getenv("DEADLINE_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+DEADLINE_WINDOW_SECONDS = int(os.getenv("DEADLINE_WINDOW_SECONDS", "3600"))
+DEADLINE_BATCH_SIZE = int(os.getenv("DEADLINE_BATCH_SIZE", "1000"))
+DEADLINE_CATCHUP_SECONDS = int(os.getenv("DEADLINE_CATCHUP_SECONDS", "60"))
+
+logger = logging.getLogger("deadlines")
+
+_handlers = []
+
+
+# Register fn(reminder) to run when an open task reaches its deadline; fn may be
+# sync or async and gets {"task_id", "owner_id", "title", "deadline"}
+def on_deadline(fn):
+    _handlers.append(fn)
+    return fn
+
+
+# Default sink: one log line per reminder
+@on_deadline
+def log_deadline(reminder: dict):
+    logger.info("Task %(task_id)s of user %(owner_id)s is due: %(title)s", reminder)
+
+
+# In-process reminder scheduler. Only open tasks due before the horizon are held
+# in memory, in a min-heap keyed by (deadline, task_id); the next window is read
+# through ix_tasks_status_deadline as a keyset range, so there is never a full scan.
+# Heap entries are invalidated lazily: _scheduled holds the deadline each task is
+# currently expected at, and a popped entry that disagrees with it is dropped.
+class DeadlineScheduler:
+    def __init__(self, session_factory=AsyncSessionLocal, window: int = DEADLINE_WINDOW_SECONDS, batch_size: int = DEADLINE_BATCH_SIZE, enabled: bool = DEADLINE_SCHEDULER_ENABLED):
+        self.session_factory = session_factory
+        self.window = timedelta(seconds=window)
+        self.batch_size = batch_size
+        self.enabled = enabled
+        self.fired = 0
+        self.loads = 0
+        self._heap = []  # (deadline, task_id)
+        self._scheduled = {}  # task_id -> (deadline, owner_id, title)
+        self._horizon = None  # (deadline, task_id) of the last row loaded
+        self._horizon_complete = None  # everything due up to here is loaded
+        self._wake = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        start = datetime.now() - timedelta(seconds=DEADLINE_CATCHUP_SECONDS)
+        self._horizon = (start, 0)
+        self._horizon_complete = start
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._heap.clear()
+        self._scheduled.clear()
+
+    # Called after a committed write. Tasks due beyond the loaded window are left
+    # for a later window read; completed or deleted tasks drop out of the heap.
+    def task_changed(self, task_id: int, owner_id: int | None = None, title: str | None = None, deadline: datetime | None = None, status: bool | None = None):
+        if self._task is None:
+            return
+        self._scheduled.pop(task_id, None)
+        if deadline is None or status or deadline > self._horizon_complete:
+            return
+        self._schedule(task_id, owner_id, title, deadline)
+        if self._heap[0][1] == task_id:
+            self._wake.set()
+
+    def task_deleted(self, task_id: int):
+        self.task_changed(task_id)
+
+    def _schedule(self, task_id, owner_id, title, deadline):
+        self._scheduled[task_id] = (deadline, owner_id, title)
+        heapq.heappush(self._heap, (deadline, task_id))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None,
+            "scheduled": len(self._scheduled),
+            "heap": len(self._heap),
+            "horizon": self._horizon_complete.isoformat() if self._horizon_complete else None,
+            "loads": self.loads,
+            "fired": self.fired,
+        }
+
+    # Read the next batch of open tasks after the horizon, in (deadline, task_id) order
+    async def _load(self, until: datetime):
+        deadline, task_id = self._horizon
+        query = (
+            select(Task.task_id, Task.owner_id, Task.title, Task.deadline)
+            .where(
+                Task.status == false(),
+                or_(Task.deadline > deadline, and_(Task.deadline == deadline, Task.task_id > task_id)),
+                Task.deadline <= until,
+            )
+            .order_by(Task.deadline, Task.task_id)
+            .limit(self.batch_size)
+        )
+        async with self.session_factory() as db:
+            rows = (await db.execute(query)).all()
+        self.loads += 1
+        for row in rows:
+            if row.task_id not in self._scheduled:
+                self._schedule(row.task_id, row.owner_id, row.title, row.deadline)
+        if len(rows) == self.batch_size:
+            # More rows share this window; continue from the last one next time
+            self._horizon = (rows[-1].deadline, rows[-1].task_id)
+            self._horizon_complete = rows[-1].deadline
+        else:
+            self._horizon = (until, 2 ** 62)
+            self._horizon_complete = until
+
+    # Drop entries whose task changed through another worker since they were scheduled
+    async def _still_due(self, due: list) -> list:
+        ids = [task_id for task_id, _ in due]
+        async with self.session_factory() as db:
+            current = dict((await db.execute(
+                select(Task.task_id, Task.deadline).where(Task.task_id.in_(ids), Task.status == false())
+            )).all())
+        ready = []
+        for task_id, entry in due:
+            deadline = current.get(task_id)
+            if deadline == entry[0]:
+                ready.append((task_id, entry))
+            elif deadline is not None and deadline <= self._horizon_complete:
+                self._schedule(task_id, entry[1], entry[2], deadline)
+        return ready
+
+    async def _fire(self, task_id: int, entry: tuple):
+        reminder = {"task_id": task_id, "owner_id": entry[1], "title": entry[2], "deadline": entry[0]}
+        for fn in _handlers:
+            try:
+                result = fn(reminder)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("deadline handler %r failed", fn)
+        self.fired += 1
+
+    async def _run(self):
+        while True:
+            try:
+                now = datetime.now()
+                # Keep at least half a window of deadlines loaded ahead of the clock
+                if self._horizon_complete < now + self.window / 2:
+                    await self._load(now + self.window)
+
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    deadline, task_id = heapq.heappop(self._heap)
+                    entry = self._scheduled.get(task_id)
+                    if entry is not None and entry[0] == deadline:
+                        due.append((task_id, self._scheduled.pop(task_id)))
+                if due:
+                    for task_id, entry in await self._still_due(due):
+                        await self._fire(task_id, entry)
+                    continue
+
+                refill_at = self._horizon_complete - self.window / 2
+                wake_at = min(self._heap[0][0], refill_at) if self._heap else refill_at
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), max((wake_at - datetime.now()).total_seconds(), 0))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("deadline scheduler iteration failed")
+                await asyncio.sleep(5)
+
+
+deadline_scheduler = DeadlineScheduler()
@@ -0,0 +1,78 @@
+from fastapi import HTTPException, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.index import User
+from utils.task_events import record_task_write
+import hashlib
+import re
+
+_TASK_ETAG = re.compile(r'^"t(\d+)-v(\d+)(?:-[0-9a-f]+)?"$')
+
+
+def _shape(*params) -> str:
+    return hashlib.sha256(repr(params).encode()).hexdigest()[:16]
+
+
+# Strong validator of one task: changes whenever the row's version does. A
+# ?fields= subset is a different representation, so it gets its own tag.
+def task_etag(task_id: int, version: int, fields: tuple | None = None) -> str:
+    if fields:
+        return f'"t{task_id}-v{version}-{_shape(fields)}"'
+    return f'"t{task_id}-v{version}"'
+
+
+# Strong validator of a task listing: the owner's change counter plus the
+# query that shaped the page, so no task has to be read to compute it
+def list_etag(owner_id: int, task_version: int, *params) -> str:
+    return f'"u{owner_id}-v{task_version}-{_shape(*params)}"'
+
+
+def _tags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+# If-None-Match uses weak comparison
+def none_match(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = _tags(if_none_match)
+    return "*" in tags or etag in [tag.removeprefix("W/") for tag in tags]
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+# Version a write must find for the task to satisfy If-Match; None means unconditional.
+# Compressed responses carry the weak form of the tag (W/), which names the same
+# row version, so it is accepted here too.
+def expected_version(if_match: str | None, task_id: int | None = None) -> int | None:
+    if not if_match or if_match.strip() == "*":
+        return None
+    for tag in _tags(if_match):
+        match = _TASK_ETAG.match(tag.removeprefix("W/"))
+        if match and (task_id is None or int(match.group(1)) == task_id):
+            return int(match.group(2))
+    raise HTTPException(status_code=412, detail="Precondition failed: task has changed")
+
+
+async def current_task_version(db: AsyncSession, owner_id: int) -> int:
+    return await db.scalar(select(User.task_version).where(User.user_id == owner_id)) or 0
+
+
+# Every task write bumps its owner's counter in the same transaction
+# and, once it commits, notifies the task write listeners. Returns the new
+# value; the bump locks the users row, so concurrent writers of one owner
+# get increasing versions that also commit in that order.
+async def bump_task_version(db: AsyncSession, owner_id: int) -> int:
+    record_task_write(db, owner_id)
+    statement = (
+        update(User)
+        .where(User.user_id == owner_id)
+        .values(task_version=User.task_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        return await db.scalar(statement.returning(User.task_version))
+    await db.execute(statement)
+    return await current_task_version(db, owner_id)
@@ -0,0 +1,51 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+from models.index import Task
+from utils.fieldsets import task_model, task_load_only
+import csv
+import io
+import os
+
+load_dotenv()
+EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "1000"))
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+# Streams the owner's tasks through a server-side cursor, one partition of
+# EXPORT_YIELD_PER rows at a time, so memory stays flat however many rows there are
+async def export_tasks(db: AsyncSession, owner_id: int, format: str, fields: tuple | None = None):
+    query = (
+        select(Task)
+        .where(Task.owner_id == owner_id)
+        .order_by(Task.task_id)
+        .execution_options(yield_per=EXPORT_YIELD_PER)
+    )
+    if fields:
+        query = query.options(task_load_only(fields, "task_id"))
+    model = task_model(fields)
+    result = await db.stream_scalars(query)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if format == "csv":
+        writer.writerow(model.model_fields)
+        yield buffer.getvalue()
+
+    async for partition in result.partitions():
+        buffer.seek(0)
+        buffer.truncate()
+        for task in partition:
+            row = model.model_validate(task)
+            if format == "csv":
+                writer.writerow(row.model_dump(mode="json").values())
+            else:
+                buffer.write(row.model_dump_json())
+                buffer.write("\n")
+        # Drop the partition from the identity map before fetching the next one
+        db.expunge_all()
+        yield buffer.getvalue()
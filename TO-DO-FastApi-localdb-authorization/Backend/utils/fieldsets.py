@@ -0,0 +1,46 @@
+from fastapi import HTTPException, Query
+from functools import lru_cache
+from pydantic import TypeAdapter, create_model
+from sqlalchemy.orm import load_only
+from models.index import Task
+from schemas.schema import TaskResponse
+from utils import serialization
+
+TASK_FIELDS = tuple(TaskResponse.model_fields)
+
+
+# Dependency for ?fields=task_id,title,... ; None means every field
+def task_fields(fields: str | None = Query(None, description="Comma-separated subset of task fields to return")) -> tuple | None:
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(TASK_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    # Canonical order, so equivalent requests share one model and one cache entry
+    return tuple(field for field in TASK_FIELDS if field in requested)
+
+
+# Response model restricted to the requested fields, built once per fieldset
+@lru_cache(maxsize=256)
+def task_model(fields: tuple | None):
+    if fields is None:
+        return TaskResponse
+    definitions = {field: (TaskResponse.model_fields[field].annotation, ...) for field in fields}
+    return create_model(f"TaskResponse_{'_'.join(fields)}", __config__={"from_attributes": True}, **definitions)
+
+
+@lru_cache(maxsize=256)
+def task_list_adapter(fields: tuple | None) -> TypeAdapter:
+    if fields is None:
+        return serialization.task_list_adapter
+    return TypeAdapter(list[task_model(fields)])
+
+
+# Loader option selecting only the columns the response (and any extra keys
+# the caller needs, e.g. the pagination sort key) actually use
+def task_load_only(fields: tuple | None, *extra: str):
+    if fields is None:
+        return None
+    names = dict.fromkeys((*fields, *extra))
+    return load_only(*(getattr(Task, name) for name in names))
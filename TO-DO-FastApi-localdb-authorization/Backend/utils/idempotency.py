@@ -0,0 +1,207 @@
+from fastapi import HTTPException, Response
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic_core import to_json
+from dotenv import load_dotenv
+from datetime import datetime, timedelta
+from config.db import AsyncSessionLocal
+from models.index import IdempotencyKey
+from utils.serialization import ModelJSONResponse
+import asyncio
+import hashlib
+import logging
+import zlib
+import os
+
+load_dotenv()
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+IDEMPOTENCY_SWEEP_SECONDS = float(os.getenv("IDEMPOTENCY_SWEEP_SECONDS", "300"))
+
+logger = logging.getLogger(__name__)
+
+
+# Identifies the request a key was first used for; reusing the key for a
+# different request is rejected instead of replaying an unrelated response
+def request_fingerprint(route: str, *parts) -> str:
+    digest = hashlib.sha256(route.encode())
+    for part in parts:
+        digest.update(b"\0")
+        digest.update(part.model_dump_json().encode() if hasattr(part, "model_dump_json") else repr(part).encode())
+    return digest.hexdigest()
+
+
+def _outcome(response: Response) -> tuple:
+    return response.status_code, bytes(response.body), response.headers.get("etag")
+
+
+def _replay(status_code: int, body: bytes, etag: str | None) -> Response:
+    headers = {"Idempotent-Replayed": "true"}
+    if etag:
+        headers["ETag"] = etag
+    return ModelJSONResponse(body, status_code=status_code, headers=headers)
+
+
+# Runs a write at most once per (owner_id, Idempotency-Key) and replays its
+# response to retries. handler(record) must await record(response) inside the
+# write's transaction, before committing it. Duplicates in this worker wait on the first one's future;
+# across workers a pending row claims the key and the others poll it. A claim
+# whose request died is taken over once IDEMPOTENCY_LOCK_SECONDS pass, and 5xx
+# outcomes release the key so the client can retry for real.
+class IdempotencyStore:
+    def __init__(self, session_factory=AsyncSessionLocal, ttl: int = IDEMPOTENCY_TTL_SECONDS):
+        self.session_factory = session_factory
+        self.ttl = timedelta(seconds=ttl)
+        self.replayed = 0
+        self.coalesced = 0
+        self.expired = 0
+        self._inflight = {}  # (owner_id, key) -> (fingerprint, Future of (status_code, body, etag))
+        self._task = None
+
+    async def run(self, db: AsyncSession, owner_id: int, key: str, fingerprint: str, handler) -> Response:
+        inflight = self._inflight.get((owner_id, key))
+        if inflight is not None:
+            if inflight[0] != fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+            self.coalesced += 1
+            return _replay(*await asyncio.shield(inflight[1]))
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[(owner_id, key)] = (fingerprint, future)
+        try:
+            return await self._run(db, owner_id, key, fingerprint, handler, future)
+        except BaseException as exc:
+            if not future.done():
+                future.set_exception(exc)
+                future.exception()  # waiters re-raise it; nothing else has to retrieve it
+            raise
+        finally:
+            del self._inflight[(owner_id, key)]
+
+    async def _run(self, db, owner_id, key, fingerprint, handler, future) -> Response:
+        row = await self._claim(db, owner_id, key, fingerprint)
+        if row is not None:
+            if row.fingerprint != fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+            self.replayed += 1
+            outcome = (row.status_code, zlib.decompress(row.body), row.etag)
+            future.set_result(outcome)
+            return _replay(*outcome)
+
+        recorded = False
+
+        # Called by the handler with its response just before it commits, so
+        # the outcome and the write it describes commit or roll back together
+        async def record(response: Response):
+            nonlocal recorded
+            await self._write(db, owner_id, key, _outcome(response))
+            recorded = True
+
+        try:
+            response = await handler(record)
+        except HTTPException as exc:
+            if exc.status_code >= 500:
+                await self._release(db, owner_id, key)
+                raise
+            # Client errors are final too: a retry gets the same answer without running the write
+            outcome = (exc.status_code, to_json({"detail": exc.detail}), None)
+            await self._store(db, owner_id, key, outcome)
+            future.set_result(outcome)
+            raise
+        except BaseException:
+            await self._release(db, owner_id, key)
+            raise
+        outcome = _outcome(response)
+        if not recorded:
+            await self._store(db, owner_id, key, outcome)
+        future.set_result(outcome)
+        return response
+
+    async def _store(self, db: AsyncSession, owner_id: int, key: str, outcome: tuple):
+        await self._write(db, owner_id, key, outcome)
+        await db.commit()
+
+    async def _write(self, db: AsyncSession, owner_id: int, key: str, outcome: tuple):
+        status_code, body, etag = outcome
+        await db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.owner_id == owner_id, IdempotencyKey.key == key)
+            .values(status_code=status_code, body=zlib.compress(body), etag=etag, expires_at=datetime.now() + self.ttl)
+            .execution_options(synchronize_session=False)
+        )
+
+    # Insert a pending row for the key. Returns None once this request owns the
+    # key, or the finished row of an earlier request to replay
+    async def _claim(self, db: AsyncSession, owner_id: int, key: str, fingerprint: str):
+        deadline = asyncio.get_running_loop().time() + IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            now = datetime.now()
+            row = await db.get(IdempotencyKey, (owner_id, key), populate_existing=True)
+            if row is not None and row.expires_at <= now:
+                # Expired, or a pending claim whose request never finished
+                await db.delete(row)
+                await db.flush()
+                row = None
+            if row is None:
+                db.add(IdempotencyKey(owner_id=owner_id, key=key, fingerprint=fingerprint, expires_at=now + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)))
+                try:
+                    await db.commit()
+                    return None
+                except IntegrityError:
+                    await db.rollback()
+                    continue
+            if row.status_code is not None or row.fingerprint != fingerprint:
+                return row
+            # Another worker is running the same request
+            await db.rollback()
+            if asyncio.get_running_loop().time() >= deadline:
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+            await asyncio.sleep(0.05)
+
+    async def _release(self, db: AsyncSession, owner_id: int, key: str):
+        try:
+            await db.rollback()
+            await db.execute(delete(IdempotencyKey).where(IdempotencyKey.owner_id == owner_id, IdempotencyKey.key == key))
+            await db.commit()
+        except Exception:
+            logger.exception("could not release Idempotency-Key %r", key)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._sweep())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    # Expired keys leave through one range delete on the expires_at index
+    async def sweep_once(self) -> int:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.now()).execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        self.expired += result.rowcount
+        return result.rowcount
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(IDEMPOTENCY_SWEEP_SECONDS)
+            try:
+                await self.sweep_once()
+            except Exception:
+                logger.exception("idempotency key sweep failed")
+
+    def stats(self) -> dict:
+        return {"inflight": len(self._inflight), "replayed": self.replayed, "coalesced": self.coalesced, "expired": self.expired}
+
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from dotenv import load_dotenv
+import hashlib
+import threading
+import time
+import os
+
+load_dotenv()
+IDENTITY_CACHE_ENABLED = os.getenv("IDENTITY_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+IDENTITY_CACHE_MAX_SIZE = int(os.getenv("IDENTITY_CACHE_MAX_SIZE", "10000"))
+# Also the longest a renamed or deleted user stays authenticated in *other*
+# worker processes: invalidate_user only reaches this process's cache
+IDENTITY_CACHE_TTL_SECONDS = float(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "30"))
+
+
+# Bounded LRU cache of verified JWT identities, keyed by the token digest.
+# An entry never outlives the token's own "exp" claim, so a hit can skip both
+# jwt.decode and the users table lookup. User writes in this process drop the
+# user's entries at once; other workers only lose theirs when the TTL runs out.
+class IdentityCache:
+    def __init__(self, max_size: int = IDENTITY_CACHE_MAX_SIZE, ttl: float = IDENTITY_CACHE_TTL_SECONDS, enabled: bool = IDENTITY_CACHE_ENABLED):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # digest -> (expires_at, identity)
+        self._by_user = {}  # user_id -> set of digests
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str):
+        if not self.enabled:
+            return None
+        key = self.digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, identity = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return identity
+
+    def put(self, token: str, identity, exp: float | None = None):
+        if not self.enabled or self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        if expires_at <= time.time():
+            return
+        key = self.digest(token)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, identity)
+            self._by_user.setdefault(identity.user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+    # Caller must hold the lock
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_user.get(entry[1].user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[entry[1].user_id]
+
+
+identity_cache = IdentityCache()
@@ -0,0 +1,68 @@
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from datetime import datetime
+from models.index import Task
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Sortable columns; every one is NOT NULL so (key, task_id) is a strict total order
+SORT_KEYS = {
+    "task_id": Task.task_id,
+    "deadline": Task.deadline,
+    "title": Task.title,
+}
+
+
+def encode_cursor(sort: str, order: str, task) -> str:
+    value = getattr(task, sort)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort, "o": order, "v": value, "id": task.task_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: str):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value, task_id = payload["v"], int(payload["id"])
+        if payload["s"] != sort or payload["o"] != order:
+            raise ValueError("cursor was issued for a different ordering")
+        # The value is compared with the sort column, so it must have its type
+        if sort == "deadline":
+            value = datetime.fromisoformat(value)
+        elif sort == "title" and not isinstance(value, str):
+            raise TypeError("title cursor value must be a string")
+        elif sort == "task_id" and (isinstance(value, bool) or not isinstance(value, int)):
+            raise TypeError("task_id cursor value must be an integer")
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    return value, task_id
+
+
+# Seek past the cursor instead of OFFSET, so every page is one index range scan
+def keyset_paginate(query, sort: str, order: str, cursor: str | None, limit: int):
+    column = SORT_KEYS[sort]
+    descending = order == "desc"
+    if cursor:
+        value, task_id = decode_cursor(cursor, sort, order)
+        if sort == "task_id":
+            query = query.where(Task.task_id < task_id if descending else Task.task_id > task_id)
+        elif descending:
+            query = query.where(or_(column < value, and_(column == value, Task.task_id < task_id)))
+        else:
+            query = query.where(or_(column > value, and_(column == value, Task.task_id > task_id)))
+    order_by = [column.desc() if descending else column.asc()]
+    if sort != "task_id":
+        order_by.append(Task.task_id.desc() if descending else Task.task_id.asc())
+    # One extra row tells us whether another page exists
+    return query.order_by(*order_by).limit(limit + 1)
+
+
+def split_page(tasks, sort: str, order: str, limit: int):
+    if len(tasks) <= limit:
+        return tasks, None
+    tasks = tasks[:limit]
+    return tasks, encode_cursor(sort, order, tasks[-1])
@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from dotenv import load_dotenv
+from utils.task_events import on_task_write
+import sys
+import os
+
+load_dotenv()
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+# LRU of serialized task list responses, keyed by (owner_id, query params) and
+# bounded by the total size of the cached bodies. Each entry remembers the
+# owner's task_version it was built from, so a write made through another
+# worker still turns it into a miss; local writes evict eagerly.
+class ResponseCache:
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES, enabled: bool = RESPONSE_CACHE_ENABLED):
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # (owner_id, params) -> (task_version, body)
+        self._by_owner = {}  # owner_id -> set of keys
+
+    @staticmethod
+    def _size(key, body: bytes) -> int:
+        return len(body) + sys.getsizeof(key[1])
+
+    def get(self, owner_id: int, params: tuple, task_version: int) -> bytes | None:
+        if not self.enabled:
+            return None
+        key = (owner_id, params)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != task_version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, owner_id: int, params: tuple, task_version: int, body: bytes):
+        if not self.enabled:
+            return
+        key = (owner_id, params)
+        size = self._size(key, body)
+        if size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (task_version, body)
+        self._by_owner.setdefault(owner_id, set()).add(key)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def evict_owner(self, owner_id: int):
+        for key in list(self._by_owner.get(owner_id, ())):
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_owner.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= self._size(key, entry[1])
+        keys = self._by_owner.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_owner[key[0]]
+
+
+response_cache = ResponseCache()
+on_task_write(response_cache.evict_owner)
@@ -0,0 +1,27 @@
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from schemas.schema import TaskResponse
+
+# Built once: validating and dumping a whole list is a single pydantic-core call
+task_list_adapter = TypeAdapter(list[TaskResponse])
+
+
+# ORM rows -> JSON array bytes, validated once with no intermediate dicts
+def dump_tasks(tasks, adapter: TypeAdapter = task_list_adapter) -> bytes:
+    return adapter.dump_json(adapter.validate_python(tasks, from_attributes=True))
+
+
+# Same wire format as TaskPage
+def dump_page(tasks, next_cursor: str | None, adapter: TypeAdapter = task_list_adapter) -> bytes:
+    return b'{"tasks":' + dump_tasks(tasks, adapter) + b',"next_cursor":' + to_json(next_cursor) + b"}"
+
+
+# For outputs the route has already built from trusted models: bytes pass
+# through and models/dicts are dumped by pydantic-core, so FastAPI's
+# response_model re-validation and jsonable_encoder are skipped
+class ModelJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return to_json(content)
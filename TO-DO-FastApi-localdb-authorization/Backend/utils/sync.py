@@ -0,0 +1,81 @@
+from fastapi import HTTPException
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+from datetime import datetime, timedelta
+from models.index import Task, User, TaskTombstone
+from utils.fieldsets import task_load_only
+from utils.serialization import dump_tasks, task_list_adapter
+import os
+
+load_dotenv()
+SYNC_PAGE_SIZE = int(os.getenv("SYNC_PAGE_SIZE", "500"))
+TASK_TOMBSTONE_RETENTION_DAYS = int(os.getenv("TASK_TOMBSTONE_RETENTION_DAYS", "30"))
+
+
+# Rows and tombstones an owner wrote after the since cursor, oldest first, as
+# (tasks, [(task_id, change_version) deleted], upto, task_version); upto is the
+# cursor for the next call and since=None is a full snapshot. A page always ends
+# on a whole change version (a bulk insert shares one), so it may exceed limit.
+async def fetch_changes(db: AsyncSession, owner_id: int, since: int | None, limit: int = SYNC_PAGE_SIZE, fields: tuple | None = None):
+    task_version, sync_floor = (await db.execute(
+        select(User.task_version, User.sync_floor).where(User.user_id == owner_id)
+    )).one()
+    if since is not None and (since < sync_floor or since > task_version):
+        raise HTTPException(status_code=410, detail="Sync cursor expired, fetch the full task list again")
+
+    query = select(Task).where(Task.owner_id == owner_id, Task.change_version <= task_version)
+    if since is not None:
+        query = query.where(Task.change_version > since)
+    if fields:
+        query = query.options(task_load_only(fields, "change_version"))
+    tasks = (await db.scalars(query.order_by(Task.change_version, Task.task_id).limit(limit + 1))).all()
+
+    upto = task_version
+    if len(tasks) > limit:
+        last = tasks[limit].change_version
+        tasks = [task for task in tasks if task.change_version < last]
+        if tasks:
+            upto = tasks[-1].change_version
+        else:
+            # One change version larger than the page; send it whole
+            upto = last
+            tasks = (await db.scalars(query.where(Task.change_version == last).order_by(Task.task_id))).all()
+
+    deleted = []
+    if since is not None:
+        deleted = (await db.execute(
+            select(TaskTombstone.task_id, TaskTombstone.change_version)
+            .where(TaskTombstone.owner_id == owner_id, TaskTombstone.change_version > since, TaskTombstone.change_version <= upto)
+            .order_by(TaskTombstone.change_version)
+        )).all()
+    return tasks, deleted, upto, task_version
+
+
+# GET /tasks/changes body: {"tasks", "deleted", "version", "has_more"}
+async def read_changes(db: AsyncSession, owner_id: int, since: int | None, limit: int = SYNC_PAGE_SIZE, fields: tuple | None = None, adapter: TypeAdapter = task_list_adapter) -> bytes:
+    tasks, deleted, upto, task_version = await fetch_changes(db, owner_id, since, limit, fields)
+    return (
+        b'{"tasks":' + dump_tasks(tasks, adapter)
+        + b',"deleted":' + to_json([row.task_id for row in deleted])
+        + b',"version":' + to_json(upto)
+        + b',"has_more":' + to_json(upto < task_version) + b"}"
+    )
+
+
+# Drop tombstones older than the retention period (blocking connection). Each
+# owner's sync_floor moves up to the newest one dropped, so a client holding an
+# older cursor gets 410 and does a full resync instead of missing deletes.
+def prune_tombstones(connection, retention_days: int = TASK_TOMBSTONE_RETENTION_DAYS):
+    cutoff = datetime.now() - timedelta(days=retention_days)
+    floors = connection.execute(
+        select(TaskTombstone.owner_id, func.max(TaskTombstone.change_version))
+        .where(TaskTombstone.deleted_at < cutoff)
+        .group_by(TaskTombstone.owner_id)
+    ).all()
+    for owner_id, floor in floors:
+        connection.execute(update(User).where(User.user_id == owner_id, User.sync_floor < floor).values(sync_floor=floor))
+        connection.execute(delete(TaskTombstone).where(TaskTombstone.owner_id == owner_id, TaskTombstone.change_version <= floor))
+    return len(floors)
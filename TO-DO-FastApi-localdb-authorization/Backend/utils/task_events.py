@@ -0,0 +1,35 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+import logging
+
+logger = logging.getLogger(__name__)
+
+_listeners = []
+
+
+# Register fn(owner_id) to run after any transaction that wrote that owner's tasks commits
+def on_task_write(fn):
+    _listeners.append(fn)
+    return fn
+
+
+# Called by every task write path; delivered only if the transaction commits
+def record_task_write(db, owner_id: int):
+    session = getattr(db, "sync_session", db)
+    session.info.setdefault("task_writes", set()).add(owner_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_task_writes(session):
+    owners = session.info.pop("task_writes", None)
+    for owner_id in owners or ():
+        for fn in _listeners:
+            try:
+                fn(owner_id)
+            except Exception:
+                logger.exception("task write listener %r failed", fn)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_task_writes(session):
+    session.info.pop("task_writes", None)
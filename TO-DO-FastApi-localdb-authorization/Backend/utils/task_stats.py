@@ -0,0 +1,67 @@
+from sqlalchemy import select, update, insert, delete, func, case, true, false
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from models.index import Task, TaskStats, User
+
+# Completed counts status = true; NULL and false are both open
+_completed = func.coalesce(func.sum(case((Task.status == true(), 1), else_=0)), 0)
+
+
+def _counts_by_owner():
+    return (
+        select(User.user_id, func.count(Task.task_id), _completed)
+        .select_from(User)
+        .outerjoin(Task, Task.owner_id == User.user_id)
+        .group_by(User.user_id)
+    )
+
+
+# Apply a delta in the caller's transaction. A user without a counters row yet
+# gets one rebuilt from tasks, which already include the caller's write.
+async def adjust_task_stats(db: AsyncSession, owner_id: int, total: int = 0, completed: int = 0):
+    if not total and not completed:
+        return
+    result = await db.execute(
+        update(TaskStats)
+        .where(TaskStats.owner_id == owner_id)
+        .values(total=TaskStats.total + total, completed=TaskStats.completed + completed)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        await _rebuild_owner(db, owner_id)
+
+
+async def _rebuild_owner(db: AsyncSession, owner_id: int):
+    counts = _counts_by_owner().where(User.user_id == owner_id)
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(TaskStats).from_select(["owner_id", "total", "completed"], counts))
+    except IntegrityError:
+        # Created concurrently; recount in place instead
+        total, completed = (await db.execute(counts)).one()[1:]
+        await db.execute(
+            update(TaskStats).where(TaskStats.owner_id == owner_id).values(total=total, completed=completed)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def read_task_stats(db: AsyncSession, owner_id: int) -> dict:
+    row = (await db.execute(select(TaskStats.total, TaskStats.completed).where(TaskStats.owner_id == owner_id))).first()
+    if row is None:
+        await _rebuild_owner(db, owner_id)
+        await db.commit()
+        row = (await db.execute(select(TaskStats.total, TaskStats.completed).where(TaskStats.owner_id == owner_id))).first()
+    # Overdue depends on the clock, so it is counted instead of stored: an index
+    # range scan over (owner_id, status, deadline) that touches only overdue rows
+    overdue = await db.scalar(
+        select(func.count()).select_from(Task)
+        .where(Task.owner_id == owner_id, Task.status == false(), Task.deadline < datetime.now())
+    )
+    return {"total": row.total, "completed": row.completed, "open": row.total - row.completed, "overdue": overdue}
+
+
+# Rebuild every user's counters from tasks with one GROUP BY (blocking connection)
+def reconcile_task_stats(connection):
+    connection.execute(delete(TaskStats))
+    connection.execute(insert(TaskStats).from_select(["owner_id", "total", "completed"], _counts_by_owner()))
@@ -0,0 +1,240 @@
+from sqlalchemy import select
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from pydantic_core import to_json
+from config.db import AsyncSessionLocal
+from models.index import User
+from schemas.schema import TaskResponse
+from utils.sync import fetch_changes
+from utils.task_events import on_task_write
+import asyncio
+import logging
+import os
+
+load_dotenv()
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "256"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_RELAY_INTERVAL = float(os.getenv("SSE_RELAY_INTERVAL", "1.0"))
+
+logger = logging.getLogger(__name__)
+
+EVICTED = object()
+
+
+def _event(version: int, kind: str, data) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (version, kind.encode(), to_json(data))
+
+
+# Task change events for one owner, in change order. A new task still has
+# row version 0; any later write has bumped it.
+def changes_to_events(tasks, deleted) -> list[tuple[int, bytes]]:
+    events = [
+        (task.change_version, _event(task.change_version, "created" if task.version == 0 else "updated", TaskResponse.model_validate(task)))
+        for task in tasks
+    ]
+    events += [(row.change_version, _event(row.change_version, "deleted", {"task_id": row.task_id})) for row in deleted]
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+class Subscriber:
+    def __init__(self, owner_id: int, since: int):
+        self.owner_id = owner_id
+        self.since = since  # last change version queued for this client
+        self.queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+
+
+# In-process fan-out of task changes to SSE subscribers. The database is the
+# relay between workers: users.task_version says which subscribed owners
+# changed, and fetch_changes reads just those rows and tombstones. Commits made
+# in this process wake the relay at once; other workers' commits are picked up
+# by a primary-key poll over subscribed owners every SSE_RELAY_INTERVAL.
+# Events carry the row's latest state, so writes the relay sees together are
+# coalesced (a task created and then edited arrives as one "updated").
+# A subscriber whose queue fills up is evicted; its client reconnects with
+# Last-Event-ID and catches up from the database.
+class TaskHub:
+    def __init__(self, session_factory=AsyncSessionLocal, relay_interval: float = SSE_RELAY_INTERVAL):
+        self.session_factory = session_factory
+        self.relay_interval = relay_interval
+        self.published = 0
+        self.evicted = 0
+        self._subscribers = {}  # owner_id -> set of Subscriber
+        self._versions = {}  # owner_id -> last change version published
+        self._dirty = set()
+        self._wake = asyncio.Event()
+        self._loop = None
+        self._task = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self._relay())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        for subscribers in list(self._subscribers.values()):
+            for subscriber in list(subscribers):
+                self._evict(subscriber)
+        self._subscribers.clear()
+        self._versions.clear()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    # Task write listener; may run on any thread
+    def notify(self, owner_id: int):
+        if self._loop is not None and owner_id in self._subscribers:
+            self._loop.call_soon_threadsafe(self._mark_dirty, owner_id)
+
+    def _mark_dirty(self, owner_id: int):
+        self._dirty.add(owner_id)
+        self._wake.set()
+
+    # Replay anything after since from the database, then join the owner's
+    # fan-out once the hub has published nothing newer than the replay reached
+    async def subscribe(self, owner_id: int, since: int | None) -> Subscriber:
+        subscriber = Subscriber(owner_id, since)
+        async with self.session_factory() as db:
+            while True:
+                task_version = await db.scalar(select(User.task_version).where(User.user_id == owner_id)) or 0
+                if subscriber.since is None:
+                    subscriber.since = task_version
+                while subscriber.since != task_version:
+                    tasks, deleted, upto, task_version = await fetch_changes(db, owner_id, subscriber.since)
+                    for version, event in changes_to_events(tasks, deleted):
+                        if subscriber.queue.full():
+                            raise HTTPException(status_code=410, detail="Too far behind, fetch /tasks/changes first")
+                        subscriber.queue.put_nowait((version, event))
+                    subscriber.since = upto
+                # End the read transaction so the next pass sees new commits
+                await db.rollback()
+                published = self._versions.get(owner_id)
+                if published is None or published <= subscriber.since:
+                    break
+        self._subscribers.setdefault(owner_id, set()).add(subscriber)
+        self._versions.setdefault(owner_id, subscriber.since)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscribers = self._subscribers.get(subscriber.owner_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[subscriber.owner_id]
+            self._versions.pop(subscriber.owner_id, None)
+
+    def _offer(self, subscriber: Subscriber, version: int, event: bytes) -> bool:
+        if subscriber.queue.full():
+            self._evict(subscriber)
+            return False
+        subscriber.queue.put_nowait((version, event))
+        return True
+
+    def _evict(self, subscriber: Subscriber):
+        self.evicted += 1
+        self.unsubscribe(subscriber)
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait((None, EVICTED))
+
+    def publish(self, owner_id: int, events: list[tuple[int, bytes]]):
+        for subscriber in list(self._subscribers.get(owner_id, ())):
+            floor = subscriber.since
+            for version, event in events:
+                if version > floor:
+                    if not self._offer(subscriber, version, event):
+                        break
+                    subscriber.since = version
+        self.published += len(events)
+
+    async def _poll(self):
+        owners = list(self._subscribers)
+        if not owners:
+            return
+        async with self.session_factory() as db:
+            rows = (await db.execute(select(User.user_id, User.task_version).where(User.user_id.in_(owners)))).all()
+        for owner_id, task_version in rows:
+            if task_version > self._versions.get(owner_id, task_version):
+                self._dirty.add(owner_id)
+
+    async def _publish_owner(self, owner_id: int):
+        async with self.session_factory() as db:
+            while owner_id in self._subscribers:
+                since = self._versions[owner_id]
+                try:
+                    tasks, deleted, upto, task_version = await fetch_changes(db, owner_id, since)
+                except HTTPException:
+                    # Cursor predates pruned tombstones; resume from the present
+                    upto = task_version = await db.scalar(select(User.task_version).where(User.user_id == owner_id))
+                    tasks, deleted = [], []
+                if owner_id in self._versions:
+                    self._versions[owner_id] = upto
+                self.publish(owner_id, changes_to_events(tasks, deleted))
+                if upto >= task_version:
+                    break
+
+    async def _relay(self):
+        polled = self._loop.time()
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), max(polled + self.relay_interval - self._loop.time(), 0))
+                except asyncio.TimeoutError:
+                    pass
+                # Local commits wake the relay early, but never starve the poll for other workers' writes
+                if self._loop.time() >= polled + self.relay_interval:
+                    polled = self._loop.time()
+                    await self._poll()
+                self._wake.clear()
+                dirty, self._dirty = self._dirty, set()
+                for owner_id in dirty:
+                    await self._publish_owner(owner_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("task stream relay failed")
+                await asyncio.sleep(self.relay_interval)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "owners": len(self._subscribers),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "evicted": self.evicted,
+        }
+
+
+task_hub = TaskHub()
+on_task_write(task_hub.notify)
+
+
+# SSE body for one subscriber: events as they are published, a comment line
+# as heartbeat when idle, and an "evicted" event before closing a slow consumer
+async def event_stream(hub: TaskHub, subscriber: Subscriber, heartbeat: float = SSE_HEARTBEAT_SECONDS):
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                version, event = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if event is EVICTED:
+                yield b"event: evicted\ndata: {}\n\n"
+                return
+            yield event
+    finally:
+        hub.unsubscribe(subscriber)
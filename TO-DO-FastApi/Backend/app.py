@@ -1,12 +1,19 @@
 from fastapi import FastAPI 
+from contextlib import asynccontextmanager
+import asyncio
 from routes.routes import taskRouter
-from config.db import create_db 
+from config.db import ensure_schema
 
-# Call create_db() to create tables on app startup
-create_db()
 
+# Check the schema on startup rather than at import; on a thread, since it may
+# wait for another worker's migration
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(ensure_schema)
+    yield
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 
 # Include the task router
@@ -0,0 +1,91 @@
+# Concurrent read/write throughput of SQLite under each profile in config/sqlite.py,
+# on a throwaway database file per profile (tasks.db is not touched).
+# Usage:
+#   python -m benchmarks.sqlite_profile [seconds] [readers] [writers]
+from sqlalchemy import create_engine, select, insert
+from sqlalchemy.exc import OperationalError
+from datetime import datetime
+from config.db import Base
+from config.sqlite import apply_sqlite_profile, SQLITE_PROFILES
+from models.index import Task
+import tempfile
+import threading
+import random
+import time
+import sys
+
+tasks = Task.__table__
+SEED_ROWS = 10000
+
+
+def task_row(title: str, now: datetime) -> dict:
+    return {"title": title, "description": "bench", "status": False, "created_at": now, "updated_at": now}
+
+
+# Readers do primary-key lookups like GET /task, writers insert one task per
+# transaction like POST /task; all run until the deadline on their own connection
+def run(profile: str, seconds: float, readers: int, writers: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            f"sqlite:///{directory}/bench.db",
+            connect_args={"check_same_thread": False},
+            pool_size=readers + writers,
+        )
+        apply_sqlite_profile(engine, profile)
+        Base.metadata.create_all(bind=engine)
+        now = datetime.now()
+        with engine.begin() as conn:
+            conn.execute(insert(tasks), [task_row(f"seed-{i}", now) for i in range(SEED_ROWS)])
+
+        counts = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def reader():
+            reads = 0
+            with engine.connect() as conn:
+                while time.perf_counter() < deadline:
+                    conn.execute(select(tasks).where(tasks.c.task_id == random.randint(1, SEED_ROWS))).first()
+                    conn.rollback()
+                    reads += 1
+            with lock:
+                counts["reads"] += reads
+
+        def writer(index: int):
+            writes = locked = 0
+            with engine.connect() as conn:
+                while time.perf_counter() < deadline:
+                    try:
+                        with conn.begin():
+                            conn.execute(insert(tasks).values(task_row(f"writer-{index}-{writes + locked}", datetime.now())))
+                        writes += 1
+                    except OperationalError:  # database is locked
+                        locked += 1
+            with lock:
+                counts["writes"] += writes
+                counts["locked"] += locked
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer, args=(index,)) for index in range(writers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        engine.dispose()
+    return {"reads/s": counts["reads"] / elapsed, "writes/s": counts["writes"] / elapsed, "locked": counts["locked"]}
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    print(f"{seconds:g}s, {readers} readers, {writers} writers")
+    results = {profile: run(profile, seconds, readers, writers) for profile in SQLITE_PROFILES}
+    for profile, result in results.items():
+        print(f"{profile:>8}: {result['reads/s']:10.0f} reads/s {result['writes/s']:8.0f} writes/s {result['locked']:6d} locked")
+    base = results["default"]
+    for profile, result in results.items():
+        if profile != "default" and base["reads/s"] and base["writes/s"]:
+            print(f"{profile} vs default: reads {result['reads/s'] / base['reads/s']:.1f}x, writes {result['writes/s'] / base['writes/s']:.1f}x")
@@ -1,10 +1,18 @@
-from sqlalchemy import create_engine,MetaData
+from sqlalchemy import create_engine,MetaData,Table,Column,Integer,select,update,insert,inspect
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
+from config.sqlite import apply_sqlite_profile
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock file, start one worker at a time
+    fcntl = None
 
 DATABASE_URL = "sqlite:///./tasks.db" 
 
 # Create the database engine
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+apply_sqlite_profile(engine)
 
 # Create a SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -22,10 +30,65 @@ def get_db():
         db.close()  # Closes the session after the request is complete
 
 
-# Function to create tables explicitly if they don't exist
-def create_db():
+# Single row holding the schema version ensure_schema last applied
+schema_version = Table(
+    "schema_version", Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+
+def create_db(connection):
     print("Creating tables if they do not exist...")
-    # Ensure the tables are created
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=connection)
     print("Tables created successfully.")
 
+
+# Ordered (version, step) pairs; a schema change appends the next one
+MIGRATIONS = [
+    (1, create_db),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def read_version(connection):
+    try:
+        return connection.execute(select(schema_version.c.version).where(schema_version.c.id == 1)).scalar() or 0
+    except OperationalError:
+        connection.rollback()
+        if inspect(connection).has_table("schema_version"):
+            raise
+        return 0  # tasks.db from before schema_version
+
+
+# Called from the app's lifespan. A current schema costs one read; otherwise
+# the pending steps run while holding a lock file, so of several workers
+# starting together only the first migrates and the rest re-read and skip.
+def ensure_schema():
+    with engine.connect() as connection:
+        version = read_version(connection)
+        if version >= SCHEMA_VERSION:
+            return version
+        connection.rollback()
+        with open(f"{engine.url.database}.schema-lock", "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            version = read_version(connection)
+            for target, step in MIGRATIONS:
+                if target > version:
+                    step(connection)
+                    if connection.execute(update(schema_version).where(schema_version.c.id == 1).values(version=target)).rowcount == 0:
+                        connection.execute(insert(schema_version).values(id=1, version=target))
+                    connection.commit()
+                    version = target
+        return version
+
+
+# Pre-fork hooks for serve.py: the master closes its pooled connections before
+# forking, and each worker drops the inherited pool without closing them again
+def before_fork():
+    engine.dispose()
+
+
+def after_fork():
+    engine.dispose(close=False)
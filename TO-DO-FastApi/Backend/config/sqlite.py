@@ -0,0 +1,73 @@
+# Shipped as both TO-DO-FastApi/Backend/config/sqlite.py and
+# Fast-api-sql/config/sqlite.py (each app is installed on its own); keep the
+# two copies identical.
+from sqlalchemy import event
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Named PRAGMA sets applied to every new SQLite connection. "default" leaves
+# SQLite as shipped (rollback journal, synchronous=FULL, ~2 MB page cache, no
+# mmap). "wal" lets readers run alongside the single writer and commits
+# without an fsync per transaction; with synchronous=NORMAL a power loss
+# (not an app crash) can drop the last commits, but never corrupts the file.
+SQLITE_PROFILES = {
+    "default": {},
+    "wal": {
+        "busy_timeout": 5000,  # ms to wait for a lock before "database is locked"
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,  # 256 MiB read through the OS page cache
+        "cache_size": -65536,  # 64 MiB; negative values are KiB
+        "temp_store": "MEMORY",
+    },
+}
+
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "wal")
+
+# Per-PRAGMA overrides on top of the chosen profile
+SQLITE_OVERRIDES = {
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS"),
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS"),
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE"),
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE"),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE"),
+}
+
+
+def sqlite_pragmas(profile: str = SQLITE_PROFILE) -> dict:
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE {profile!r}, expected one of {sorted(SQLITE_PROFILES)}")
+    pragmas = dict(SQLITE_PROFILES[profile])
+    pragmas.update({name: value for name, value in SQLITE_OVERRIDES.items() if value})
+    return pragmas
+
+
+# Run the profile's PRAGMAs on each connection the engine's pool opens
+def apply_sqlite_profile(engine, profile: str = SQLITE_PROFILE):
+    pragmas = sqlite_pragmas(profile)
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return engine
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            if name == "journal_mode":
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+        journal_mode = pragmas.get("journal_mode")
+        if journal_mode:
+            # SQLite answers with the mode it ended up in, which stays the old
+            # one when it can't switch (e.g. WAL on a network share or :memory:).
+            # execute() and fetchone() are separate calls so this also works on
+            # the aiosqlite adapter cursor, whose execute() returns nothing usable.
+            cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+            applied = cursor.fetchone()[0]
+            if applied.lower() != journal_mode.lower():
+                logger.warning("SQLite journal_mode=%s was not applied, running with %s", journal_mode, applied)
+        cursor.close()
+
+    return engine